@@ -1,62 +1,29 @@
 import tkinter as tk
-from tkinter import ttk, colorchooser
-
-# Конвертации RGB <-> HSV
-def rgb_to_hsv(r, g, b):
-    r_p, g_p, b_p = r / 255.0, g / 255.0, b / 255.0
-    c_max, c_min = max(r_p, g_p, b_p), min(r_p, g_p, b_p)
-    delta = c_max - c_min
-    h = 0
-    s = 0
-    v = c_max
-    if delta != 0:
-        s = delta / c_max
-        if c_max == r_p:
-            h = 60 * (((g_p - b_p) / delta) % 6)
-        elif c_max == g_p:
-            h = 60 * ((b_p - r_p) / delta + 2)
-        else:
-            h = 60 * ((r_p - g_p) / delta + 4)
-    return int(round(h)), int(round(s * 100)), int(round(v * 100))
-
-def hsv_to_rgb(h, s, v):
-    s /= 100.0
-    v /= 100.0
-    c = v * s
-    x = c * (1 - abs((h / 60) % 2 - 1))
-    m = v - c
-    r_p = g_p = b_p = 0
-    if 0 <= h < 60: r_p, g_p, b_p = c, x, 0
-    elif 60 <= h < 120: r_p, g_p, b_p = x, c, 0
-    elif 120 <= h < 180: r_p, g_p, b_p = 0, c, x
-    elif 180 <= h < 240: r_p, g_p, b_p = 0, x, c
-    elif 240 <= h < 300: r_p, g_p, b_p = x, 0, c
-    elif 300 <= h < 360: r_p, g_p, b_p = c, 0, x
-    r = int(round((r_p + m) * 255))
-    g = int(round((g_p + m) * 255))
-    b = int(round((b_p + m) * 255))
-    return r, g, b
-
-# Конвертации RGB <-> CMYK
-def rgb_to_cmyk(r, g, b):
-    if r == g == b == 0:
-        return 0, 0, 0, 100
-    r_p, g_p, b_p = r / 255.0, g / 255.0, b / 255.0
-    k = 1 - max(r_p, g_p, b_p)
-    c = (1 - r_p - k) / (1 - k)
-    m = (1 - g_p - k) / (1 - k)
-    y = (1 - b_p - k) / (1 - k)
-    return int(round(c * 100)), int(round(m * 100)), int(round(y * 100)), int(round(k * 100))
-
-def cmyk_to_rgb(c, m, y, k):
-    r = 255 * (1 - c / 100) * (1 - k / 100)
-    g = 255 * (1 - m / 100) * (1 - k / 100)
-    b = 255 * (1 - y / 100) * (1 - k / 100)
-    return int(round(r)), int(round(g)), int(round(b))
+from tkinter import ttk, colorchooser, filedialog, messagebox
+
+from kg.color import rgb_to_hsv, hsv_to_rgb, rgb_to_cmyk, cmyk_to_rgb
+from kg.palette import PaletteIndex, load_palette
+
+# Не чаще одного пересчёта и перерисовки за кадр (~60 к/с)
+FRAME_MS = 16
+
+# Поля каждой секции: по ним видно, что пользователь изменил с прошлого пересчёта
+SECTIONS = {
+    'rgb': ('r_val', 'g_val', 'b_val'),
+    'cmyk': ('c_val', 'm_val', 'y_val', 'k_val'),
+    'hsv': ('h_val', 's_val', 'v_val'),
+}
 
 class ColorConverterApp:
     def __init__(self, master):
         self.master = master
+        self._update_job = None
+        self._pending_sources = []
+        self._shown = {}
+        self.recompute_count = 0
+        self.coalesced_count = 0
+        self.palette_index = None
+        self.palette_names = []
         master.title("Конвертер Цвета (RGB/CMYK/HSV)")
         master.configure(bg="#E0E0E0")
 
@@ -84,9 +51,21 @@ class ColorConverterApp:
         self.hex_label = tk.Label(top_frame, textvariable=self.hex_code, font=("Arial", 12), bg="white")
         self.hex_label.pack(pady=(0, 10))
 
+        self.stats_label = tk.Label(top_frame, text="", font=("Arial", 8), fg="gray", bg="white")
+        self.stats_label.pack(pady=(0, 5))
+
         btn_color = tk.Button(top_frame, text="Выбрать цвет из палитры", command=self.open_color_picker)
         btn_color.pack(pady=(0, 10))
 
+        # Ближайший цвет загруженной палитры
+        palette_frame = tk.Frame(top_frame, bg="white")
+        palette_frame.pack(pady=(0, 10))
+        tk.Button(palette_frame, text="Загрузить палитру", command=self.open_palette).pack(side="left", padx=5)
+        self.palette_swatch = tk.Label(palette_frame, width=3, bg="white", relief="solid", bd=1)
+        self.palette_swatch.pack(side="left", padx=5)
+        self.palette_label = tk.Label(palette_frame, text="Палитра не загружена", bg="white")
+        self.palette_label.pack(side="left", padx=5)
+
         # Контрольная панель (RGB, CMYK, HSV) — в одну строку
         controls_frame = tk.Frame(master, bg="#E0E0E0")
         controls_frame.pack(fill="x", padx=10, pady=0)
@@ -95,7 +74,7 @@ class ColorConverterApp:
         self.create_cmyk_section(controls_frame).pack(side="left", fill="x", expand=True, padx=5)
         self.create_hsv_section(controls_frame).pack(side="left", fill="x", expand=True, padx=5)
 
-        self.update_color(source='rgb')
+        self.recompute(source='rgb')
 
     def open_color_picker(self):
         color_code = colorchooser.askcolor(title="Выберите цвет")
@@ -106,6 +85,27 @@ class ColorConverterApp:
             self.b_val.set(b)
             self.update_color(source='rgb')
 
+    def open_palette(self):
+        path = filedialog.askopenfilename(title="Файл палитры (#RRGGBB [имя] в строке)",
+                                          filetypes=[("Палитры", "*.txt *.hex"), ("Все файлы", "*.*")])
+        if not path:
+            return
+        try:
+            colors, self.palette_names = load_palette(path)
+            self.palette_index = PaletteIndex(colors, space="rgb")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Ошибка палитры", str(e))
+            return
+        self.update_palette_match(self.r_val.get(), self.g_val.get(), self.b_val.get())
+
+    def update_palette_match(self, r, g, b):
+        if self.palette_index is None:
+            return
+        idx, dist = self.palette_index.query([[r, g, b]])
+        pr, pg, pb = self.palette_index.palette[idx[0]].tolist()
+        self.palette_swatch.config(bg=f"#{pr:02X}{pg:02X}{pb:02X}")
+        self.palette_label.config(text=f"{self.palette_names[idx[0]]} (расстояние {dist[0]:.1f})")
+
     def create_scale_and_entry(self, parent, text, var, from_, to, color, command):
         frame = tk.Frame(parent, bg="#F8F8F8", pady=2)
         lbl = tk.Label(frame, text=text, fg=color, bg="#F8F8F8", width=2, anchor="w")
@@ -167,6 +167,46 @@ class ColorConverterApp:
         return frame
 
     def update_color(self, source=None):
+        # Откладываем пересчёт до следующего кадра; все вызовы до этого момента
+        # сливаются в один, источники запоминаются в порядке правок
+        if source in self._pending_sources:
+            self._pending_sources.remove(source)
+        self._pending_sources.append(source)
+        if self._update_job is not None:
+            self.coalesced_count += 1
+            return
+        self._update_job = self.master.after(FRAME_MS, self._flush_update)
+
+    def _flush_update(self):
+        self._update_job = None
+        sources, self._pending_sources = self._pending_sources, []
+        # Правки всех секций снимаются до пересчёта: пересчёт по первой
+        # секции перезапишет поля остальных
+        edits = {}
+        for source in sources:
+            for name in SECTIONS.get(source, ()):
+                try:
+                    value = getattr(self, name).get()
+                except tk.TclError:
+                    continue
+                if value != self._shown.get(name):
+                    edits[name] = value
+        # Секции применяются по очереди, как если бы каждая правка пришла в свой кадр
+        for source in sources:
+            for name in SECTIONS.get(source, ()):
+                if name in edits:
+                    getattr(self, name).set(edits[name])
+            self.recompute(source)
+
+    def set_if_changed(self, var, value):
+        try:
+            if var.get() == value:
+                return
+        except tk.TclError:
+            pass
+        var.set(value)
+
+    def recompute(self, source=None):
         try:
             if source == 'rgb':
                 r, g, b = self.r_val.get(), self.g_val.get(), self.b_val.get()
@@ -180,26 +220,33 @@ class ColorConverterApp:
             print(f"Ошибка конвертации: {e}")
             return
 
-        self.r_val.set(r)
-        self.g_val.set(g)
-        self.b_val.set(b)
+        self.recompute_count += 1
+
+        self.set_if_changed(self.r_val, r)
+        self.set_if_changed(self.g_val, g)
+        self.set_if_changed(self.b_val, b)
 
         c, m, y, k = rgb_to_cmyk(r, g, b)
         if source != 'cmyk':
-            self.c_val.set(c)
-            self.m_val.set(m)
-            self.y_val.set(y)
-            self.k_val.set(k)
+            self.set_if_changed(self.c_val, c)
+            self.set_if_changed(self.m_val, m)
+            self.set_if_changed(self.y_val, y)
+            self.set_if_changed(self.k_val, k)
 
         h, s, v = rgb_to_hsv(r, g, b)
         if source != 'hsv':
-            self.h_val.set(h)
-            self.s_val.set(s)
-            self.v_val.set(v)
+            self.set_if_changed(self.h_val, h)
+            self.set_if_changed(self.s_val, s)
+            self.set_if_changed(self.v_val, v)
 
         hex_color = f"#{r:02X}{g:02X}{b:02X}"
-        self.hex_code.set(hex_color)
-        self.color_preview.config(bg=hex_color)
+        if self.hex_code.get() != hex_color:
+            self.hex_code.set(hex_color)
+            self.color_preview.config(bg=hex_color)
+            self.update_palette_match(r, g, b)
+        self._shown = {name: getattr(self, name).get() for names in SECTIONS.values() for name in names}
+        self.stats_label.config(
+            text=f"Пересчётов: {self.recompute_count}, сэкономлено: {self.coalesced_count}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,10 +1,77 @@
 import cv2
-import numpy as np
 import tkinter as tk
-from tkinter import filedialog, ttk
+from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import os
+import queue
 import sys
+import threading
+import time
+
+from kg.image import (ImageCache, apply_sharpen, load_test_image, threshold_local_mean,
+                      threshold_sauvola)
+from kg.pipeline import STAGES, Pipeline, StageCache
+from kg.video import VideoPipeline
+
+PREVIEW_SIZE = (400, 400)
+POLL_MS = 15
+# Пауза после последнего изменения параметра, после которой считается полное разрешение
+FULL_PASS_MS = 250
+VIDEO_POLL_MS = 200
+
+
+class LatestOnlyWorker:
+    """Фоновый поток, который всегда считает только последний поставленный запрос.
+
+    Новый запрос заменяет ещё не начатый; результаты устаревших запросов
+    отбрасываются при выдаче. Готовые результаты забираются из главного
+    потока через poll().
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = None
+        self._latest_id = 0
+        self._results = queue.Queue()
+        self.dropped = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, func):
+        with self._cond:
+            self._latest_id += 1
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (self._latest_id, func, time.perf_counter())
+            self._cond.notify()
+            return self._latest_id
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                request_id, func, t0 = self._pending
+                self._pending = None
+            try:
+                result = func()
+            except Exception as e:
+                print(f"Ошибка обработки: {e}")
+                result = None
+            self._results.put((request_id, result, t0))
+
+    def poll(self):
+        # Последний актуальный результат из готовых: (результат, задержка в с) или None
+        latest = None
+        while True:
+            try:
+                request_id, result, t0 = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if request_id == self._latest_id:
+                latest = (result, time.perf_counter() - t0)
+            else:
+                self.dropped += 1
+        return latest
+
 
 class ImageProcessor:
     def __init__(self, root):
@@ -14,13 +81,22 @@ class ImageProcessor:
         
         self.original_img = None
         self.processed_img = None
+        self.cache = None
+        self.worker = LatestOnlyWorker()
+        self.stage_cache = StageCache()
+        self._polling = False
+        # Поколение показанного результата: растёт при каждом новом запросе и
+        # мгновенном предпросмотре, результаты прежних поколений отбрасываются
+        self._generation = 0
+        self._full_pass_job = None
+        self.video = None
+        self.video_preview = None
         self.test_images_dir = "test_images"
      
         if sys.platform.startswith('win'):
             self.test_images_dir = "test_images_lab_2"
         
         self.setup_ui()
-        self.create_test_images()
     
     def setup_ui(self):
         left_frame = ttk.Frame(self.root)
@@ -39,6 +115,16 @@ class ImageProcessor:
         ttk.Button(left_frame, text="Тест 3 (шум)", 
                   command=lambda: self.load_test(2)).pack(pady=2)
         
+        self.video_button = ttk.Button(left_frame, text="Обработать видео...",
+                                       command=self.process_video)
+        self.video_button.pack(pady=(15, 2))
+        ttk.Label(left_frame, text="Предпросмотр каждого N-го кадра (0 — выкл.):").pack()
+        self.preview_every_var = tk.IntVar(value=10)
+        ttk.Spinbox(left_frame, from_=0, to=1000, textvariable=self.preview_every_var,
+                    width=6).pack()
+        self.video_label = ttk.Label(left_frame, text="", wraplength=380)
+        self.video_label.pack()
+        
         right_frame = ttk.Frame(self.root)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         ttk.Label(right_frame, text="Результат").pack()
@@ -51,7 +137,10 @@ class ImageProcessor:
         self.method_var = tk.StringVar(value="sharpen")
         methods = [("Высокочастотный фильтр", "sharpen"),
                    ("Порог ручной", "threshold_manual"),
-                   ("Порог Otsu", "threshold_otsu")]
+                   ("Порог Otsu", "threshold_otsu"),
+                   ("Локальный порог (среднее)", "threshold_mean"),
+                   ("Локальный порог (Sauvola)", "threshold_sauvola"),
+                   ("Конвейер", "pipeline")]
         for i, (text, value) in enumerate(methods):
             ttk.Radiobutton(control, text=text, variable=self.method_var,
                            value=value, command=self.process_image).pack(anchor=tk.W, padx=10)
@@ -61,75 +150,68 @@ class ImageProcessor:
         scale = ttk.Scale(control, from_=0, to=255, variable=self.threshold_var, 
                          orient=tk.HORIZONTAL, command=self.on_param_change)
         scale.pack(fill=tk.X, padx=10, pady=5)
+        # Пока ползунок тянут — предпросмотр по LUT, полное разрешение — после
+        # паузы в изменениях (и с мыши, и с клавиатуры) или сразу по отпусканию
+        scale.bind("<ButtonRelease-1>", lambda e: self.on_param_release())
         self.threshold_label = ttk.Label(control, text="127")
         self.threshold_label.pack()
+        self.fraction_label = ttk.Label(control, text="Передний план: -")
+        self.fraction_label.pack()
         
-        ttk.Button(control, text="Обработать", command=self.process_image).pack(pady=10)
-    
-    def create_test_images(self):
-        """Создаёт тестовые изображения с АНГЛИЙСКИМИ именами"""
-        if not os.path.exists(self.test_images_dir):
-            os.makedirs(self.test_images_dir)
-            
-        # Тест 1: размытое
-        blurry = self.create_blurry()
-        blurry.save(os.path.join(self.test_images_dir, "blurry_test.jpg"), quality=95)
+        ttk.Label(control, text="Окно локального порога:").pack(anchor=tk.W)
+        self.window_var = tk.IntVar(value=15)
+        window_scale = ttk.Scale(control, from_=3, to=101, variable=self.window_var,
+                                 orient=tk.HORIZONTAL, command=self.on_window_change)
+        window_scale.pack(fill=tk.X, padx=10, pady=5)
+        window_scale.bind("<ButtonRelease-1>", lambda e: self.on_param_release())
+        self.window_label = ttk.Label(control, text="15")
+        self.window_label.pack()
         
-        #Тест 2: низкий контраст
-        low_contrast = self.create_low_contrast()
-        low_contrast.save(os.path.join(self.test_images_dir, "low_contrast_test.jpg"), quality=95)
+        # Конвейер: этапы через ">", параметры в скобках
+        ttk.Label(control, text="Конвейер:").pack(anchor=tk.W)
+        pipeline_frame = ttk.Frame(control)
+        pipeline_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.pipeline_var = tk.StringVar(value="gray > sharpen > threshold(thresh=127)")
+        pipeline_entry = ttk.Entry(pipeline_frame, textvariable=self.pipeline_var)
+        pipeline_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        pipeline_entry.bind("<Return>", lambda e: self.process_image())
+        self.stage_var = tk.StringVar(value="sharpen")
+        ttk.Combobox(pipeline_frame, textvariable=self.stage_var, values=list(STAGES),
+                     state="readonly", width=10).pack(side=tk.LEFT, padx=5)
+        ttk.Button(pipeline_frame, text="Добавить этап",
+                   command=self.add_pipeline_stage).pack(side=tk.LEFT)
+        ttk.Button(pipeline_frame, text="Сбросить",
+                   command=lambda: self.pipeline_var.set("gray")).pack(side=tk.LEFT, padx=5)
+        self.latency_label = ttk.Label(control, text="Задержка: -")
+        self.latency_label.pack()
         
-        # Тест 3:с шумом
-        noisy = self.create_noisy()
-        noisy.save(os.path.join(self.test_images_dir, "noisy_test.jpg"), quality=95)
-    
-    def create_blurry(self):
-        img = np.zeros((300, 400), dtype=np.uint8)
-        cv2.rectangle(img, (50, 50), (350, 250), 200, -1)
-        cv2.circle(img, (200, 150), 80, 100, -1)
-        return Image.fromarray(cv2.GaussianBlur(img, (15, 15), 0))
-    
-    def create_low_contrast(self):
-        img = np.zeros((300, 400), dtype=np.uint8)
-        cv2.rectangle(img, (50, 50), (350, 250), 120, -1)
-        cv2.circle(img, (200, 150), 80, 60, -1)
-        return Image.fromarray(img)
-    
-    def create_noisy(self):
-        img = np.zeros((300, 400), dtype=np.uint8)
-        cv2.rectangle(img, (80, 80), (320, 220), 255, -1)
-        cv2.circle(img, (200, 150), 60, 0, -1)
-        noise = np.random.normal(0, 25, img.shape)
-        noisy = np.clip(img.astype(np.float32) + noise, 0, 255).astype(np.uint8)
-        return Image.fromarray(noisy)
+        ttk.Button(control, text="Обработать", command=self.process_image).pack(pady=10)
     
     def load_image(self):
         file_path = filedialog.askopenfilename(
             filetypes=[("Images", "*.jpg *.jpeg *.png *.bmp *.tiff")])
         if file_path:
-            self.original_img = cv2.imread(file_path)
-            if self.original_img is not None:
+            img = cv2.imread(file_path)
+            if img is not None:
+                self.set_image(img)
                 self.display_original()
                 self.process_image()
     
     def load_test(self, index):
-        test_files = ["blurry_test.jpg", "low_contrast_test.jpg", "noisy_test.jpg"]
-        test_path = os.path.join(self.test_images_dir, test_files[index])
-        
-        if os.path.exists(test_path):
-            self.original_img = cv2.imread(test_path)
-            self.display_original()
-            self.process_image()
-        else:
-            print(f"Файл {test_path} не найден. Создаю тестовые...")
-            self.create_test_images()
-            self.original_img = cv2.imread(test_path)
-            self.display_original()
+        # Генерируется при первом обращении, дальше берётся из памяти или с диска
+        name = ["blurry", "low_contrast", "noisy"][index]
+        self.set_image(load_test_image(name, self.test_images_dir))
+        self.display_original()
+        self.process_image()
     
+    def set_image(self, img):
+        # Новое изображение — новый кэш производных данных
+        self.original_img = img
+        self.cache = ImageCache(img) if img is not None else None
+
     def display_original(self):
         if self.original_img is not None:
-            display_img = cv2.cvtColor(self.original_img, cv2.COLOR_BGR2RGB)
-            display_img = cv2.resize(display_img, (400, 400))
+            display_img = self.cache.preview(PREVIEW_SIZE)
             img_pil = Image.fromarray(display_img)
             photo = ImageTk.PhotoImage(img_pil)
             self.original_label.configure(image=photo)
@@ -140,32 +222,91 @@ class ImageProcessor:
             return
         
         method = self.method_var.get()
-        gray = cv2.cvtColor(self.original_img, cv2.COLOR_BGR2GRAY)
+        # Кэш захватывается сейчас, чтобы смена изображения во время расчёта
+        # в фоне не смешала данные
+        cache = self.cache
         
         if method == "sharpen":
-            self.processed_img = self.apply_sharpen(gray)
+            key, compute = method, apply_sharpen
         elif method == "threshold_manual":
             thresh = int(self.threshold_var.get())
-            _, self.processed_img = cv2.threshold(gray, thresh, 255, cv2.THRESH_BINARY)
+            key, compute = (method, thresh), lambda gray: cache.thresholds.apply(thresh)
         elif method == "threshold_otsu":
-            _, self.processed_img = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            key, compute = method, lambda gray: cache.thresholds.apply_otsu()
+        elif method == "threshold_mean":
+            window = self.window_size()
+            key, compute = (method, window), lambda gray: threshold_local_mean(gray, window)
+        elif method == "threshold_sauvola":
+            window = self.window_size()
+            key, compute = (method, window), lambda gray: threshold_sauvola(gray, window)
+        elif method == "pipeline":
+            try:
+                pipeline = Pipeline.parse(self.pipeline_var.get(), self.stage_cache)
+            except ValueError as e:
+                messagebox.showerror("Ошибка конвейера", str(e))
+                return
+            key = (method, str(pipeline))
+            compute = lambda gray: pipeline.run(cache.img, cache.content_hash)
+        else:
+            return
         
-        self.display_processed()
-    
-    def apply_sharpen(self, img):
-        kernel = np.array([
-            [-1, -1, -1],
-            [-1,  9, -1],
-            [-1, -1, -1]
-        ], dtype=np.float32)
+        self._generation += 1
+        generation = self._generation
 
-        sharpened = cv2.filter2D(img, -1, kernel)
-        return np.clip(sharpened, 0, 255).astype(np.uint8)
+        def job():
+            # Гистограмма и LUT готовятся заранее, чтобы предпросмотр порога
+            # в главном потоке не считал их сам
+            cache.thresholds
+            result = cache.result(key, compute)
+            return generation, result, cv2.resize(result, PREVIEW_SIZE)
 
+        self.worker.submit(job)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self.poll_worker)
+    
+    def poll_worker(self):
+        done = self.worker.poll()
+        if done is None:
+            self.root.after(POLL_MS, self.poll_worker)
+            return
+        self._polling = False
+        result, latency = done
+        if result is None:
+            return
+        generation, processed, preview = result
+        if generation != self._generation:
+            # Пока считали, показали более свежий предпросмотр
+            self.worker.dropped += 1
+            return
+        self.processed_img = processed
+        self.display_processed(preview)
+        self.update_fraction_label()
+        self.latency_label.config(
+            text=f"Задержка: {latency * 1000:.1f} мс, пропущено устаревших: {self.worker.dropped}")
     
-    def display_processed(self):
-        if self.processed_img is not None:
-            display_img = cv2.resize(self.processed_img, (400, 400))
+    def update_fraction_label(self):
+        if self.cache is None or not self.cache.thresholds_ready:
+            return
+        engine = self.cache.thresholds
+        method = self.method_var.get()
+        if method == "threshold_manual":
+            thresh = int(self.threshold_var.get())
+        elif method == "threshold_otsu":
+            thresh = engine.otsu
+        else:
+            self.fraction_label.config(text="Передний план: -")
+            return
+        self.fraction_label.config(
+            text=f"Порог {thresh}, передний план: {engine.foreground_fraction(thresh) * 100:.1f} %")
+    
+    def display_processed(self, display_img=None):
+        if display_img is None and self.processed_img is not None:
+            display_img = cv2.resize(self.processed_img, PREVIEW_SIZE)
+        if display_img is not None:
+            if display_img.ndim == 3:
+                # OpenCV хранит каналы как BGR, PIL ждёт RGB
+                display_img = cv2.cvtColor(display_img, cv2.COLOR_BGR2RGB)
             img_pil = Image.fromarray(display_img)
             photo = ImageTk.PhotoImage(img_pil)
             self.processed_label.configure(image=photo)
@@ -173,7 +314,87 @@ class ImageProcessor:
     
     def on_param_change(self, value):
         self.threshold_label.config(text=f"{int(float(value))}")
-        if self.method_var.get() == "threshold_manual":
+        if self.method_var.get() != "threshold_manual" or self.cache is None:
+            return
+        self.schedule_full_pass()
+        if not self.cache.thresholds_ready:
+            # Гистограмма ещё считается в фоне — ждём полного прохода после паузы
+            return
+        # Результаты, запрошенные до этого изменения, предпросмотр не перезапишут
+        self._generation += 1
+        preview = self.cache.thresholds.apply(int(float(value)), preview=True)
+        self.display_processed(cv2.resize(preview, PREVIEW_SIZE, interpolation=cv2.INTER_NEAREST))
+        self.update_fraction_label()
+    
+    def add_pipeline_stage(self):
+        text = self.pipeline_var.get().strip()
+        stage = self.stage_var.get()
+        self.pipeline_var.set(f"{text} > {stage}" if text else stage)
+    
+    def window_size(self):
+        # Окно — нечётное, чтобы пиксель был в центре
+        return int(float(self.window_var.get())) // 2 * 2 + 1
+    
+    def on_window_change(self, value):
+        self.window_label.config(text=f"{self.window_size()}")
+        self.schedule_full_pass()
+    
+    def process_video(self):
+        if self.video is not None and self.video.running:
+            self.video.stop()
+            return
+        method = self.method_var.get()
+        if method == "pipeline":
+            messagebox.showerror("Видео", "Для видео выберите один из методов, кроме конвейера")
+            return
+        src = filedialog.askopenfilename(filetypes=[("Video", "*.mp4 *.avi *.mkv *.mov")])
+        if not src:
+            return
+        dst = filedialog.asksaveasfilename(defaultextension=".avi",
+                                           filetypes=[("AVI", "*.avi"), ("MP4", "*.mp4")])
+        if not dst:
+            return
+        try:
+            every = max(0, int(self.preview_every_var.get()))
+        except (tk.TclError, ValueError):
+            every = 0
+        self.video_preview = None
+        self.video = VideoPipeline(src, dst, method, int(self.threshold_var.get()),
+                                   self.window_size(), preview_every=every,
+                                   on_preview=self.on_video_frame).start()
+        self.video_button.config(text="Остановить видео")
+        self.root.after(VIDEO_POLL_MS, self.poll_video)
+
+    def on_video_frame(self, index, frame):
+        # Вызывается из потока обработки: только сохраняем ссылку, показ — в poll_video
+        self.video_preview = frame
+
+    def poll_video(self):
+        video = self.video
+        frame, self.video_preview = self.video_preview, None
+        if frame is not None:
+            self.display_processed(cv2.resize(frame, PREVIEW_SIZE))
+        if video.running:
+            self.video_label.config(text=video.report())
+            self.root.after(VIDEO_POLL_MS, self.poll_video)
+            return
+        self.video_button.config(text="Обработать видео...")
+        if video.error is not None:
+            self.video_label.config(text="")
+            messagebox.showerror("Видео", str(video.error))
+        else:
+            self.video_label.config(text="Готово: " + video.report())
+    
+    def schedule_full_pass(self):
+        if self._full_pass_job is not None:
+            self.root.after_cancel(self._full_pass_job)
+        self._full_pass_job = self.root.after(FULL_PASS_MS, self.on_param_release)
+
+    def on_param_release(self):
+        if self._full_pass_job is not None:
+            self.root.after_cancel(self._full_pass_job)
+            self._full_pass_job = None
+        if self.method_var.get() in ("threshold_manual", "threshold_mean", "threshold_sauvola"):
             self.process_image()
 
 if __name__ == "__main__":
@@ -3,192 +3,137 @@ from tkinter import ttk, messagebox
 import time
 import math
 
+from kg.framebuffer import FrameBuffer
+from kg.raster import (step_by_step_line, dda_line, bresenham_line,
+                       castle_pitway_spans, bresenham_circle, filled_circle_spans,
+                       midpoint_ellipse, filled_ellipse_spans, polyline, polygon_spans,
+                       timed, visible_steps)
+
 WIDTH, HEIGHT = 800, 800
 CELL_SIZE = 20
+CELL_MIN, CELL_MAX = 2, 80
 GRID_MIN, GRID_MAX = -20, 20
 
-X0 = WIDTH // 2
-Y0 = HEIGHT // 2
-
-
-def grid_to_screen(x, y):
-    sx = X0 + x * CELL_SIZE
-    sy = Y0 - y * CELL_SIZE
-    return sx, sy
-
-
-def draw_grid(canvas):
-    canvas.delete("all")
-    canvas.create_rectangle(0, 0, WIDTH, HEIGHT, fill="white", outline="")
-
-    for gx in range(GRID_MIN, GRID_MAX + 1):
-        sx1, sy1 = grid_to_screen(gx, GRID_MIN)
-        sx2, sy2 = grid_to_screen(gx, GRID_MAX)
-        canvas.create_line(sx1, sy1, sx2, sy2, fill="#dddddd")
-
-    for gy in range(GRID_MIN, GRID_MAX + 1):
-        sx1, sy1 = grid_to_screen(GRID_MIN, gy)
-        sx2, sy2 = grid_to_screen(GRID_MAX, gy)
-        canvas.create_line(sx1, sy1, sx2, sy2, fill="#dddddd")
-
-    sx1, sy1 = grid_to_screen(GRID_MIN, 0)
-    sx2, sy2 = grid_to_screen(GRID_MAX, 0)
-    canvas.create_line(sx1, sy1, sx2, sy2, width=2, fill="black")
 
-    sx1, sy1 = grid_to_screen(0, GRID_MIN)
-    sx2, sy2 = grid_to_screen(0, GRID_MAX)
-    canvas.create_line(sx1, sy1, sx2, sy2, width=2, fill="black")
-
-    for v in range(GRID_MIN, GRID_MAX + 1, 5):
-        if v == 0:
-            continue
-        sx, sy = grid_to_screen(v, 0)
-        canvas.create_text(sx, sy + 10, text=str(v), fill="black", font=("Arial", 8))
-        sx, sy = grid_to_screen(0, v)
-        canvas.create_text(sx - 10, sy, text=str(v), fill="black", font=("Arial", 8))
-
-    canvas.create_text(X0 + (GRID_MAX - 1) * CELL_SIZE, Y0 + 15,
-                       text="X", font=("Arial", 10, "bold"))
-    canvas.create_text(X0 - 15, Y0 - (GRID_MAX - 1) * CELL_SIZE,
-                       text="Y", font=("Arial", 10, "bold"))
-
-
-def draw_pixel(canvas, x, y, color="red"):
-    if x < GRID_MIN or x >= GRID_MAX or y < GRID_MIN or y >= GRID_MAX:
-        return
-
-    x1 = X0 + x * CELL_SIZE
-    x2 = X0 + (x + 1) * CELL_SIZE
-    y2 = Y0 - y * CELL_SIZE
-    y1 = Y0 - (y + 1) * CELL_SIZE
-
-    canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline=color)
-
-
-def step_by_step_line(x1, y1, x2, y2):
-    points = []
-
-    dx = x2 - x1
-    dy = y2 - y1
-
-    if dx == 0 and dy == 0:
-        return [(x1, y1)]
-
-    if abs(dx) >= abs(dy):
-        k = dy / dx
-        b = y1 - k * x1
-        step = 1 if x2 >= x1 else -1
-        x = x1
-        while True:
-            y = k * x + b
-            points.append((int(round(x)), int(round(y))))
-            if x == x2:
-                break
-            x += step
-    else:
-        k = dx / dy
-        b = x1 - k * y1
-        step = 1 if y2 >= y1 else -1
-        y = y1
-        while True:
-            x = k * y + b
-            points.append((int(round(x)), int(round(y))))
-            if y == y2:
-                break
-            y += step
-
-    return points
-
-
-def dda_line(x1, y1, x2, y2):
-    points = []
-
-    dx = x2 - x1
-    dy = y2 - y1
-
-    steps = int(max(abs(dx), abs(dy)))
-    if steps == 0:
-        return [(x1, y1)]
-
-    x_inc = dx / steps
-    y_inc = dy / steps
-
-    x = x1
-    y = y1
-    for _ in range(steps + 1):
-        points.append((int(round(x)), int(round(y))))
-        x += x_inc
-        y += y_inc
-
-    return points
-
-
-def bresenham_line(x1, y1, x2, y2):
-    points = []
-
-    dx = abs(x2 - x1)
-    dy = abs(y2 - y1)
-    sx = 1 if x1 < x2 else -1
-    sy = 1 if y1 < y2 else -1
-    err = dx - dy
-
-    x, y = x1, y1
-    while True:
-        points.append((x, y))
-        if x == x2 and y == y2:
-            break
-        e2 = 2 * err
-        if e2 > -dy:
-            err -= dy
-            x += sx
-        if e2 < dx:
-            err += dx
-            y += sy
-
-    return points
-
-
-def castle_pitway_line(x1, y1, x2, y2):
-    return bresenham_line(x1, y1, x2, y2)
-
-
-def bresenham_circle(xc, yc, r):
-    points = []
-
-    x = 0
-    y = r
-    d = 3 - 2 * r
-
-    def add_symmetry_points(cx, cy, x, y, container):
-        container.extend([
-            (cx + x, cy + y),
-            (cx - x, cy + y),
-            (cx + x, cy - y),
-            (cx - x, cy - y),
-            (cx + y, cy + x),
-            (cx - y, cy + x),
-            (cx + y, cy - x),
-            (cx - y, cy - x),
-        ])
-
-    while x <= y:
-        add_symmetry_points(xc, yc, x, y, points)
-        if d < 0:
-            d = d + 4 * x + 6
-        else:
-            d = d + 4 * (x - y) + 10
-            y -= 1
-        x += 1
-
-    points = list(dict.fromkeys(points))
-    return points
-
-
-def timed(func, *args, **kwargs):
-    t0 = time.perf_counter()
-    result = func(*args, **kwargs)
-    t1 = time.perf_counter()
-    return result, (t1 - t0)
+class Viewport:
+    """Видимая часть сетки: клетка в левом верхнем углу и размер клетки в пикселях."""
+
+    def __init__(self, width=WIDTH, height=HEIGHT, cell=CELL_SIZE, left=GRID_MIN, top=GRID_MAX):
+        self.width, self.height = width, height
+        self.cell = cell
+        self.left, self.top = left, top
+
+    @property
+    def cols(self):
+        return math.ceil(self.width / self.cell)
+
+    @property
+    def rows(self):
+        return math.ceil(self.height / self.cell)
+
+    def bounds(self):
+        # (xmin, ymin, xmax, ymax): видимы клетки xmin <= x < xmax, ymin <= y < ymax
+        return self.left, self.top - self.rows, self.left + self.cols, self.top
+
+    def key(self):
+        return self.cell, self.left, self.top
+
+    def to_screen(self, x, y):
+        return (x - self.left) * self.cell, (self.top - y) * self.cell
+
+    def pan(self, dx, dy):
+        # Сдвиг содержимого на dx клеток вправо и dy вверх
+        self.left -= dx
+        self.top -= dy
+
+    def zoom(self, factor):
+        # Масштаб вокруг центра видимой области
+        cx, cy = self.left + self.cols / 2, self.top - self.rows / 2
+        self.cell = max(CELL_MIN, min(CELL_MAX, round(self.cell * factor)))
+        self.left = round(cx - self.cols / 2)
+        self.top = round(cy + self.rows / 2)
+
+
+def draw_grid(canvas, view):
+    # Сетка — отдельный слой с тегом "grid"; белый фон даёт картинка
+    # кадрового буфера под ней
+    canvas.delete("grid")
+    xmin, ymin, xmax, ymax = view.bounds()
+
+    # При мелких клетках тонкие линии слились бы в серый фон
+    if view.cell >= 6:
+        for gx in range(xmin, xmax + 1):
+            sx1, sy1 = view.to_screen(gx, ymin)
+            sx2, sy2 = view.to_screen(gx, ymax)
+            canvas.create_line(sx1, sy1, sx2, sy2, fill="#dddddd", tags="grid")
+
+        for gy in range(ymin, ymax + 1):
+            sx1, sy1 = view.to_screen(xmin, gy)
+            sx2, sy2 = view.to_screen(xmax, gy)
+            canvas.create_line(sx1, sy1, sx2, sy2, fill="#dddddd", tags="grid")
+
+    if ymin <= 0 <= ymax:
+        sx1, sy1 = view.to_screen(xmin, 0)
+        sx2, sy2 = view.to_screen(xmax, 0)
+        canvas.create_line(sx1, sy1, sx2, sy2, width=2, fill="black", tags="grid")
+
+    if xmin <= 0 <= xmax:
+        sx1, sy1 = view.to_screen(0, ymin)
+        sx2, sy2 = view.to_screen(0, ymax)
+        canvas.create_line(sx1, sy1, sx2, sy2, width=2, fill="black", tags="grid")
+
+    # Подписи — вдоль осей, а если ось за краем, то у ближнего края
+    ax, ay = view.to_screen(0, 0)
+    ax = min(max(ax, 20), view.width)
+    ay = min(max(ay, 0), view.height - 20)
+    step = 5
+    while step * view.cell < 40:
+        step *= 2
+    for v in range(xmin // step * step, xmax + 1, step):
+        if v != 0:
+            sx, _ = view.to_screen(v, 0)
+            canvas.create_text(sx, ay + 10, text=str(v), fill="black", font=("Arial", 8),
+                               tags="grid")
+    for v in range(ymin // step * step, ymax + 1, step):
+        if v != 0:
+            _, sy = view.to_screen(0, v)
+            canvas.create_text(ax - 10, sy, text=str(v), fill="black", font=("Arial", 8),
+                               tags="grid")
+
+    canvas.create_text(view.width - 20, ay + 15,
+                       text="X", font=("Arial", 10, "bold"), tags="grid")
+    canvas.create_text(ax - 15, 20,
+                       text="Y", font=("Arial", 10, "bold"), tags="grid")
+
+
+# Алгоритм -> (функция, цвет) для отрезков, которые рисуются по точкам
+LINE_ALGORITHMS = {
+    "step": (step_by_step_line, "#ff0000"),
+    "dda": (dda_line, "#0000ff"),
+    "bresenham": (bresenham_line, "#008000"),
+}
+
+
+# Фигура -> (функция, заливка): контуры — списки точек, заливки — серии
+FIGURES = {
+    "окружность": (bresenham_circle, False),
+    "круг": (filled_circle_spans, True),
+    "эллипс": (midpoint_ellipse, False),
+    "заливка эллипса": (filled_ellipse_spans, True),
+}
+
+
+# Режим -> (замкнута ли, правило заливки); без правила — контур из отрезков
+POLYGONS = {
+    "ломаная": (False, None),
+    "многоугольник": (True, None),
+    "заливка чёт-нечет": (True, "evenodd"),
+    "заливка ненулевая": (True, "nonzero"),
+}
+
+
+def draw_pixel(fb, x, y, color="#ff0000"):
+    fb.set(x, y, color)
 
 
 def blend_color(base_hex, alpha):
@@ -204,11 +149,10 @@ def blend_color(base_hex, alpha):
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
-def wu_line(canvas, x0, y0, x1, y1, base_color="#ff0000"):
+def wu_line(fb, x0, y0, x1, y1, base_color="#ff0000"):
     if x0 == x1 or y0 == y1:
-        pts = bresenham_line(x0, y0, x1, y1)
-        for (x, y) in pts:
-            draw_pixel(canvas, x, y, color=base_color)
+        pts = bresenham_line(x0, y0, x1, y1, view=fb.bounds)
+        fb.plot(pts, base_color)
         return len(pts)
 
     steep = abs(y1 - y0) > abs(x1 - x0)
@@ -224,25 +168,22 @@ def wu_line(canvas, x0, y0, x1, y1, base_color="#ff0000"):
     dy = y1 - y0
     gradient = dy / dx if dx != 0 else 0.0
 
+    # Проходятся только столбцы, попадающие в буфер (в осях после перестановки)
+    xmin, ymin, xmax, ymax = fb.bounds
+    steps = visible_steps(x0, y0, x1, y1, (ymin, xmin, ymax, xmax) if steep else fb.bounds)
+    if steps is None:
+        return 0
+
     def plot_alpha(px, py, alpha):
         if alpha <= 0:
             return
         if steep:
             px, py = py, px
-        if px < GRID_MIN or px >= GRID_MAX or py < GRID_MIN or py >= GRID_MAX:
-            return
-
-        x1_ = X0 + px * CELL_SIZE
-        x2_ = X0 + (px + 1) * CELL_SIZE
-        y2_ = Y0 - py * CELL_SIZE
-        y1_ = Y0 - (py + 1) * CELL_SIZE
-
-        color = blend_color(base_color, max(0.0, min(1.0, alpha)))
-        canvas.create_rectangle(x1_, y1_, x2_, y2_, fill=color, outline=color)
+        draw_pixel(fb, px, py, blend_color(base_color, max(0.0, min(1.0, alpha))))
 
     count = 0
 
-    for x in range(x0, x1 + 1):
+    for x in range(x0 + steps[0], x0 + steps[1] + 1):
         y_real = y0 + gradient * (x - x0)
         y_int = math.floor(y_real)
         frac = y_real - y_int
@@ -283,7 +224,7 @@ class RasterApp:
         self.x2_entry.grid(row=3, column=1)
         self.y2_entry.grid(row=4, column=1)
 
-        tk.Label(control, text="Окружность: центр (xc,yc), R").grid(
+        tk.Label(control, text="Окружность/эллипс: центр (xc,yc), R, Ry").grid(
             row=5, column=0, columnspan=2, sticky="w"
         )
 
@@ -299,8 +240,21 @@ class RasterApp:
         self.yc_entry.grid(row=7, column=1)
         self.r_entry.grid(row=8, column=1)
 
+        tk.Label(control, text="Ry").grid(row=9, column=0, sticky="e")
+        self.ry_entry = tk.Entry(control, width=6)
+        self.ry_entry.grid(row=9, column=1)
+
+        self.figure_var = tk.StringVar(value="окружность")
+        ttk.Combobox(
+            control,
+            textvariable=self.figure_var,
+            state="readonly",
+            values=list(FIGURES),
+            width=15,
+        ).grid(row=10, column=0, columnspan=2, pady=3)
+
         tk.Label(control, text="Алгоритм для отрезка").grid(
-            row=9, column=0, columnspan=2, sticky="w"
+            row=11, column=0, columnspan=2, sticky="w"
         )
 
         self.alg_var = tk.StringVar(value="step")
@@ -317,25 +271,126 @@ class RasterApp:
             ],
             width=15,
         )
-        alg_box.grid(row=10, column=0, columnspan=2, pady=3)
+        alg_box.grid(row=12, column=0, columnspan=2, pady=3)
 
         self.info_label = tk.Label(control, text="Время: -", fg="blue")
-        self.info_label.grid(row=11, column=0, columnspan=2, pady=5)
+        self.info_label.grid(row=13, column=0, columnspan=2, pady=5)
 
         tk.Button(
             control, text="Нарисовать отрезок", command=self.draw_line
-        ).grid(row=12, column=0, columnspan=2, pady=3, sticky="we")
+        ).grid(row=14, column=0, columnspan=2, pady=3, sticky="we")
         tk.Button(
-            control, text="Нарисовать окружность (Брезенхем)", command=self.draw_circle
-        ).grid(row=13, column=0, columnspan=2, pady=3, sticky="we")
+            control, text="Нарисовать фигуру", command=self.draw_circle
+        ).grid(row=15, column=0, columnspan=2, pady=3, sticky="we")
+        tk.Label(control, text="Ломаная/многоугольник: x y; x y; ...").grid(
+            row=16, column=0, columnspan=2, sticky="w", pady=(10, 0)
+        )
+        self.vertices_entry = tk.Entry(control, width=24)
+        self.vertices_entry.grid(row=17, column=0, columnspan=2)
+
+        self.polygon_var = tk.StringVar(value="многоугольник")
+        ttk.Combobox(
+            control,
+            textvariable=self.polygon_var,
+            state="readonly",
+            values=list(POLYGONS),
+            width=15,
+        ).grid(row=18, column=0, columnspan=2, pady=3)
+        tk.Button(
+            control, text="Нарисовать многоугольник", command=self.draw_polygon
+        ).grid(row=19, column=0, columnspan=2, pady=3, sticky="we")
+
         tk.Button(
             control, text="Очистить", command=self.clear_canvas
-        ).grid(row=14, column=0, columnspan=2, pady=3, sticky="we")
+        ).grid(row=20, column=0, columnspan=2, pady=3, sticky="we")
+
+        tk.Label(control, text="Вид: перетаскивание — сдвиг, колесо — масштаб").grid(
+            row=21, column=0, columnspan=2, sticky="w", pady=(10, 0)
+        )
+        tk.Button(
+            control, text="Приблизить", command=lambda: self.zoom(2)
+        ).grid(row=22, column=0, pady=3, sticky="we")
+        tk.Button(
+            control, text="Отдалить", command=lambda: self.zoom(0.5)
+        ).grid(row=22, column=1, pady=3, sticky="we")
+        tk.Button(
+            control, text="Сбросить вид", command=self.reset_view
+        ).grid(row=23, column=0, columnspan=2, pady=3, sticky="we")
+
+        self.canvas.bind("<ButtonPress-1>", self.on_drag_start)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(2 if e.delta > 0 else 0.5))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(2))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(0.5))
+
+        # Нарисованные фигуры хранятся списком и при сдвиге или масштабе
+        # растеризуются заново — только в пределах видимой области
+        self.shapes = []
+        self.view = Viewport()
+        self._grid_key = None
+        self._drag = None
+        # Всё нарисованное живёт в кадровом буфере и выводится одной картинкой:
+        # маленькая (клетка = пиксель) копируется с увеличением в полноразмерную
+        self.canvas.create_image(0, 0, anchor="nw", tags="framebuffer")
+        self.set_view()
+
+    def set_view(self):
+        xmin, ymin, xmax, ymax = self.view.bounds()
+        self.fb = FrameBuffer(xmin, xmax, ymin, ymax)
+        self.fb_small = tk.PhotoImage(width=self.fb.width, height=self.fb.height)
+        self.fb_photo = tk.PhotoImage(width=self.fb.width * self.view.cell,
+                                      height=self.fb.height * self.view.cell)
+        self.canvas.itemconfig("framebuffer", image=self.fb_photo)
+        self.update_grid()
+        for shape in self.shapes:
+            self.render(shape)
+        self.blit()
+
+    def update_grid(self):
+        # Сетка перестраивается, только если изменилась её геометрия
+        key = self.view.key()
+        if key == self._grid_key:
+            return
+        draw_grid(self.canvas, self.view)
+        self.canvas.tag_lower("framebuffer")
+        self._grid_key = key
 
-        draw_grid(self.canvas)
+    def blit(self):
+        if not self.fb.dirty:
+            return
+        self.fb_small.configure(data=self.fb.to_ppm(), format="PPM")
+        self.fb_photo.tk.call(self.fb_photo, "copy", self.fb_small,
+                              "-zoom", self.view.cell, self.view.cell)
+        self.fb.dirty = False
+
+    def zoom(self, factor):
+        cell = self.view.cell
+        self.view.zoom(factor)
+        if self.view.cell != cell:
+            self.set_view()
+
+    def reset_view(self):
+        self.view = Viewport()
+        self.set_view()
+
+    def on_drag_start(self, event):
+        self._drag = (event.x, event.y)
+
+    def on_drag(self, event):
+        # Сдвиг — на целые клетки, остаток копится до следующего движения
+        cell = self.view.cell
+        dx = int((event.x - self._drag[0]) / cell)
+        dy = int((event.y - self._drag[1]) / cell)
+        if dx or dy:
+            self.view.pan(dx, -dy)
+            self._drag = (self._drag[0] + dx * cell, self._drag[1] + dy * cell)
+            self.set_view()
 
     def clear_canvas(self):
-        draw_grid(self.canvas)
+        # Стираются только примитивы (кадровый буфер), сетка остаётся
+        self.shapes.clear()
+        self.fb.clear()
+        self.blit()
         self.info_label.config(text="Время: -")
 
     def get_int(self, entry, name):
@@ -344,6 +399,79 @@ class RasterApp:
         except ValueError:
             raise ValueError(f"Некорректное целое значение в поле {name}")
 
+    def get_vertices(self, entry):
+        # "x y; x y; ..." — вершины через точку с запятой
+        vertices = []
+        for item in entry.get().split(";"):
+            if not item.strip():
+                continue
+            try:
+                x, y = map(int, item.replace(",", " ").split())
+            except ValueError:
+                raise ValueError(f"Некорректная вершина: {item.strip()}")
+            vertices.append((x, y))
+        return vertices
+
+    def render(self, shape):
+        """Растеризует фигуру в кадровый буфер с отсечением по виду; возвращает текст для подписи."""
+        kind, alg, args = shape
+        view = self.fb.bounds
+
+        if kind == "figure":
+            func, filled = FIGURES[alg]
+            result, dt = timed(func, *args, view=view)
+            if filled:
+                # Заливка приходит сериями — каждая строка одним срезом
+                for x, y, length in result:
+                    self.fb.span(x, y, length, True, "#800080")
+                count = sum(span[2] for span in result)
+            else:
+                self.fb.plot(result, "#800080")
+                count = len(result)
+            return f"Время ({alg}): {dt * 1000:.4f} мс, видимых пикселей: {count}"
+
+        if kind == "polygon":
+            vertices, line_alg = args
+            closed, rule = POLYGONS[alg]
+            if rule:
+                spans, dt = timed(polygon_spans, vertices, rule, view=view)
+                for x, y, length in spans:
+                    self.fb.span(x, y, length, True, "#00a0a0")
+                count = sum(span[2] for span in spans)
+            else:
+                # Контур — отрезки выбранным алгоритмом, общие вершины без повторов
+                func, color = LINE_ALGORITHMS[line_alg]
+                points, dt = timed(polyline, vertices, func, closed, view=view)
+                self.fb.plot(points, color)
+                count = len(points)
+            return (f"Время ({alg}): {dt * 1000:.4f} мс, "
+                    f"вершин: {len(vertices)}, видимых пикселей: {count}")
+
+        if alg == "smooth":
+            t0 = time.perf_counter()
+            count = wu_line(self.fb, *args, base_color="#ff0000")
+            dt = time.perf_counter() - t0
+            return f"Время (smooth/Wu): {dt * 1000:.4f} мс, закрашенных клеток: {count}"
+
+        if alg == "castle":
+            # Касл–Питтвей выдаёт серии, каждая закрашивается одним срезом
+            (spans, horizontal), dt = timed(castle_pitway_spans, *args, view=view)
+            for x, y, length in spans:
+                self.fb.span(x, y, length, horizontal, "#ffa500")
+            return (f"Время (castle): {dt * 1000:.4f} мс, "
+                    f"видимых пикселей: {sum(span[2] for span in spans)}, серий: {len(spans)}")
+
+        func, color = LINE_ALGORITHMS[alg]
+        points, dt = timed(func, *args, view=view)
+        self.fb.plot(points, color)
+        return f"Время ({alg}): {dt * 1000:.4f} мс, видимых пикселей: {len(points)}"
+
+    def add_shape(self, shape):
+        self.shapes.append(shape)
+        text = self.render(shape)
+        self.blit()
+        self.info_label.config(text=text)
+
     def draw_line(self):
         try:
             x1 = self.get_int(self.x1_entry, "x1")
@@ -355,62 +483,48 @@ class RasterApp:
             return
 
         alg = self.alg_var.get()
-
-        if alg == "smooth":
-            t0 = time.perf_counter()
-            count = wu_line(self.canvas, x1, y1, x2, y2, base_color="#ff0000")
-            dt = time.perf_counter() - t0
-            self.info_label.config(
-                text=f"Время (smooth/Wu): {dt * 1000:.4f} мс, закрашенных клеток: {count}"
-            )
-            return
-
-        if alg == "step":
-            func = step_by_step_line
-            color = "red"
-        elif alg == "dda":
-            func = dda_line
-            color = "blue"
-        elif alg == "bresenham":
-            func = bresenham_line
-            color = "green"
-        elif alg == "castle":
-            func = castle_pitway_line
-            color = "orange"
-        else:
+        if alg not in LINE_ALGORITHMS and alg not in ("smooth", "castle"):
             messagebox.showerror("Ошибка", "Неизвестный алгоритм")
             return
 
-        points, dt = timed(func, x1, y1, x2, y2)
-
-        for (x, y) in points:
-            draw_pixel(self.canvas, x, y, color=color)
-
-        self.info_label.config(
-            text=f"Время ({alg}): {dt * 1000:.4f} мс, пикселей: {len(points)}"
-        )
+        self.add_shape(("line", alg, (x1, y1, x2, y2)))
 
     def draw_circle(self):
         try:
             xc = self.get_int(self.xc_entry, "xc")
             yc = self.get_int(self.yc_entry, "yc")
             r = self.get_int(self.r_entry, "R")
+            # Пустое Ry — эллипс с равными полуосями
+            ry = self.get_int(self.ry_entry, "Ry") if self.ry_entry.get().strip() else r
         except ValueError as e:
             messagebox.showerror("Ошибка ввода", str(e))
             return
 
-        if r <= 0:
+        if r <= 0 or ry <= 0:
             messagebox.showerror("Ошибка", "Радиус должен быть > 0")
             return
 
-        points, dt = timed(bresenham_circle, xc, yc, r)
+        figure = self.figure_var.get()
+        args = (xc, yc, r, ry) if figure in ("эллипс", "заливка эллипса") else (xc, yc, r)
+        self.add_shape(("figure", figure, args))
 
-        for (x, y) in points:
-            draw_pixel(self.canvas, x, y, color="purple")
+    def draw_polygon(self):
+        try:
+            vertices = self.get_vertices(self.vertices_entry)
+        except ValueError as e:
+            messagebox.showerror("Ошибка ввода", str(e))
+            return
 
-        self.info_label.config(
-            text=f"Время (окружн. Брезенхем): {dt * 1000:.4f} мс, пикселей: {len(points)}"
-        )
+        mode = self.polygon_var.get()
+        closed, _ = POLYGONS[mode]
+        if len(vertices) < (3 if closed else 2):
+            messagebox.showerror("Ошибка", f"Нужно не меньше {3 if closed else 2} вершин")
+            return
+
+        # castle и smooth рисуют только отдельные отрезки — контур строится Брезенхемом
+        alg = self.alg_var.get()
+        line_alg = alg if alg in LINE_ALGORITHMS else "bresenham"
+        self.add_shape(("polygon", mode, (tuple(vertices), line_alg)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+"""Время локальной бинаризации в зависимости от размера окна.
+
+Через интегральные изображения стоимость на пиксель не зависит от окна;
+для сравнения меряется cv2.adaptiveThreshold (ADAPTIVE_THRESH_MEAN_C).
+
+    python benchmarks/adaptive_threshold.py [--size 3840x2160] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from kg.image import threshold_local_mean, threshold_sauvola
+
+WINDOWS = (3, 15, 51, 151, 501)
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="3840x2160", help="ШxВ тестового изображения")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    width, height = map(int, args.size.split("x"))
+    # Неравномерно освещённый «скан»: градиент плюс шум
+    rng = np.random.default_rng(0)
+    light = np.linspace(60, 200, width)[None, :] + np.linspace(-30, 30, height)[:, None]
+    gray = np.clip(light + rng.normal(0, 20, (height, width)), 0, 255).astype(np.uint8)
+
+    methods = {
+        "mean (integral)": lambda w: threshold_local_mean(gray, w),
+        "sauvola (integral)": lambda w: threshold_sauvola(gray, w),
+        "cv2.adaptiveThreshold": lambda w: cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, w, 5),
+    }
+    print(f"{width}x{height}, лучшее из {args.repeat}, мс")
+    print(f"{'окно':>6} " + " ".join(f"{name:>22}" for name in methods))
+    times = {name: [] for name in methods}
+    for window in WINDOWS:
+        row = []
+        for name, func in methods.items():
+            dt = best_time(lambda: func(window), args.repeat)
+            times[name].append(dt)
+            row.append(f"{dt * 1000:22.1f}")
+        print(f"{window:>6} " + " ".join(row))
+    print("max/min по окнам: " + ", ".join(
+        f"{name} {max(t) / min(t):.2f}" for name, t in times.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Касл–Питтвей (серии) против Брезенхема (пиксели) на длинных пологих отрезках.
+
+Для каждого отрезка меряется построение (castle_pitway_spans против
+bresenham_line) и построение вместе с закраской: серия пишется одним
+срезом, пиксели — по одному. Чтобы длинные отрезки не требовали растра
+в гигабайты, пишется одна строка шириной dx + 1 (y не учитывается —
+стоимость записи та же). Набор пикселей сверяется.
+
+    python benchmarks/castle_pitteway.py [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from kg.raster import bresenham_line, castle_pitway_line, castle_pitway_spans
+
+# (длина по x, подъём по y)
+LINES = ((10_000, 3), (10_000, 100), (100_000, 7), (100_000, 2_000), (1_000_000, 50), (1_000_000, 40_000))
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def fill_points(row, dx, dy):
+    for x, y in bresenham_line(0, 0, dx, dy):
+        row[x] = 255
+
+
+def fill_spans(row, dx, dy):
+    spans, _ = castle_pitway_spans(0, 0, dx, dy)
+    for x, y, length in spans:
+        row[x:x + length] = 255
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'отрезок':>18} {'серий':>7} {'Брезенхем, мс':>14} {'серии, мс':>10} {'ускор.':>7} "
+          f"{'+закраска Бр., мс':>18} {'+закраска серий, мс':>20} {'ускор.':>7} совпад.")
+    for dx, dy in LINES:
+        t_bres = best_time(lambda: bresenham_line(0, 0, dx, dy), args.repeat)
+        t_spans = best_time(lambda: castle_pitway_spans(0, 0, dx, dy), args.repeat)
+        row = np.zeros(dx + 1, dtype=np.uint8)
+        t_fill_bres = best_time(lambda: fill_points(row, dx, dy), args.repeat)
+        t_fill_spans = best_time(lambda: fill_spans(row, dx, dy), args.repeat)
+        same = sorted(castle_pitway_line(0, 0, dx, dy)) == sorted(bresenham_line(0, 0, dx, dy))
+        spans, _ = castle_pitway_spans(0, 0, dx, dy)
+        print(f"{f'{dx}x{dy}':>18} {len(spans):>7} {t_bres * 1000:14.2f} {t_spans * 1000:10.2f} "
+              f"{t_bres / t_spans:6.1f}x {t_fill_bres * 1000:18.2f} {t_fill_spans * 1000:20.2f} "
+              f"{t_fill_bres / t_fill_spans:6.1f}x {'да' if same else 'НЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
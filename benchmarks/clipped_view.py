@@ -0,0 +1,58 @@
+"""Отсечение по виду: время не должно расти с размером фигуры.
+
+Огромный эллипс с полуосями a и 3a/4 (контур и заливка) и длинный отрезок Касла–Питтвея
+рисуются в маленьком окне 60x60 клеток: у вершины, на склоне и у оси.
+При работе по видимым пикселям время почти одинаково для всех радиусов.
+
+    python benchmarks/clipped_view.py [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kg.raster import castle_pitway_spans, filled_ellipse_spans, midpoint_ellipse
+
+SIZES = (10 ** 3, 10 ** 6, 10 ** 9)
+SIDE = 60
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def views(a, b):
+    # У вершины на оси x, у вершины на оси y и на склоне в середине дуги
+    sx, sy = round(a / 2 ** 0.5), round(b / 2 ** 0.5)
+    return {"ось x": (a - SIDE, -SIDE // 2, a + 5, SIDE // 2),
+            "ось y": (-SIDE // 2, b - SIDE, SIDE // 2, b + 5),
+            "склон": (sx - SIDE // 2, sy - SIDE // 2, sx + SIDE // 2, sy + SIDE // 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'размер':>11} {'вид':>6} {'контур, мс':>11} {'заливка, мс':>12} {'Касл–Питтвей, мс':>17}")
+    for a in SIZES:
+        b = a * 3 // 4
+        for name, view in views(a, b).items():
+            # Отрезок из начала координат через центр вида и дальше вдвое
+            cx, cy = (view[0] + view[2]) // 2, (view[1] + view[3]) // 2
+            t_outline = best_time(lambda: midpoint_ellipse(0, 0, a, b, view=view), args.repeat)
+            t_fill = best_time(lambda: filled_ellipse_spans(0, 0, a, b, view=view), args.repeat)
+            t_line = best_time(lambda: castle_pitway_spans(0, 0, 2 * cx, 2 * cy, view=view), args.repeat)
+            print(f"{a:>11} {name:>6} {t_outline * 1000:11.3f} {t_fill * 1000:12.3f} {t_line * 1000:17.3f}")
+
+
+if __name__ == "__main__":
+    main()
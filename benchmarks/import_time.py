@@ -0,0 +1,69 @@
+"""Время холодного импорта модулей пакета kg.
+
+Каждый модуль импортируется в отдельном свежем процессе несколько раз,
+берётся минимум. Выход с кодом 1, если бюджет превышен или модуль
+подтянул GUI/OpenCV.
+
+    python benchmarks/import_time.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# модуль -> бюджет холодного импорта, мс
+BUDGETS_MS = {
+    "kg": 20,
+    "kg.raster": 30,
+    "kg.color": 250,
+    "kg.framebuffer": 250,
+    "kg.image": 250,
+    "kg.color_cli": 300,
+    "kg.palette": 250,
+    "kg.tiles": 250,
+    "kg.batch": 250,
+    "kg.pipeline": 250,
+    "kg.video": 250,
+}
+FORBIDDEN = ("tkinter", "cv2", "PIL")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+dt = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": dt, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    best, loaded = None, []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, forbidden=FORBIDDEN)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(out)
+        loaded = result["loaded"]
+        best = result["ms"] if best is None else min(best, result["ms"])
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        ms, loaded = measure(module, args.repeat)
+        ok = ms <= budget and not loaded
+        failed |= not ok
+        extra = f", загружены: {', '.join(loaded)}" if loaded else ""
+        print(f"{'OK  ' if ok else 'FAIL'} {module:<14} {ms:7.1f} мс (бюджет {budget} мс){extra}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Пакетная растеризация отрезков против скалярных функций kg.raster.
+
+Скалярные функции служат эталоном: результат пакетных версий сверяется
+с ними точка в точку на всех отрезках.
+
+    python benchmarks/lines.py [--count 100000] [--extent 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from kg.raster import (bresenham_line, bresenham_line_array, dda_line, dda_line_array,
+                       step_by_step_line, step_by_step_line_array)
+
+PAIRS = {
+    "step": (step_by_step_line, step_by_step_line_array),
+    "dda": (dda_line, dda_line_array),
+    "bresenham": (bresenham_line, bresenham_line_array),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="число отрезков")
+    parser.add_argument("--extent", type=int, default=50, help="координаты в [-extent, extent)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    segments = rng.integers(-args.extent, args.extent, (args.count, 4))
+    seg_list = segments.tolist()
+    print(f"{args.count} отрезков, координаты в [-{args.extent}, {args.extent})")
+    for name, (scalar, batch) in PAIRS.items():
+        t0 = time.perf_counter()
+        expected = [scalar(*s) for s in seg_list]
+        t_scalar = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        points, offsets = batch(segments)
+        t_batch = time.perf_counter() - t0
+
+        flat = [p for line in expected for p in line]
+        same = (len(flat) == len(points) and
+                np.array_equal(np.array(flat, dtype=np.int64).reshape(-1, 2), points) and
+                np.array_equal(np.diff(offsets), [len(line) for line in expected]))
+        print(f"{name:>10}: скалярно {t_scalar:.3f} с, пакетно {t_batch:.3f} с, "
+              f"ускорение {t_scalar / t_batch:.1f}x, точек {len(points)}, "
+              f"совпадение: {'да' if same else 'НЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Задержка, пропускная способность и пиковая память методов 2lab.py по размерам.
+
+Тестовые изображения — генераторы kg.image (create_blurry и др.),
+масштабированные до нужного размера, в сером и цветном (BGR) виде, 8 и 16
+бит на канал. Каждый замер идёт в свежем процессе. До замеров cv2 уже
+импортирован и метод один раз прогнан на крошечном кадре, поэтому холодный
+вызов — первый на полном размере (выделение буферов, промахи кэшей) без
+времени импорта, а тёплый — медиана повторов после него. Пиковая память —
+прирост ru_maxrss за время вызовов сверх загруженных библиотек и
+изображения. Результаты пишутся в JSON; с --compare печатается отношение
+тёплого времени к прежнему прогону.
+
+    python benchmarks/methods.py [--sizes 1920x1080,7680x4320] [--inputs gray] [--dtypes uint8]
+                                 [-o bench.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cv2
+import numpy as np
+
+from kg.image import METHODS, TEST_IMAGES
+
+DEFAULT_SIZES = "1920x1080,3840x2160,7680x4320"
+INPUTS = ("gray", "bgr")
+DTYPES = ("uint8", "uint16")
+
+PROBE = """
+import json, resource, statistics, sys, time
+t0 = time.perf_counter()
+import cv2
+import numpy as np
+from kg.image import apply_method, to_gray
+img = np.load({path!r})
+import_ms = (time.perf_counter() - t0) * 1000
+# Прогрев на крошечном кадре: библиотеки загружены, пути кода пройдены —
+# ни в холодное время, ни в пик памяти они уже не попадут
+apply_method(to_gray(np.ascontiguousarray(img[:32, :32])), {method!r})
+
+def rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def call():
+    return apply_method(to_gray(img), {method!r})
+
+base = rss()
+t0 = time.perf_counter()
+call()
+cold = time.perf_counter() - t0
+times = []
+for _ in range({repeat}):
+    t0 = time.perf_counter()
+    call()
+    times.append(time.perf_counter() - t0)
+print(json.dumps({{"cold_ms": cold * 1000, "warm_ms": statistics.median(times) * 1000,
+                  "warm_min_ms": min(times) * 1000, "import_ms": import_ms,
+                  "peak_mb": (rss() - base) / (1 << 20)}}))
+"""
+
+
+def make_image(name, width, height, channels, dtype):
+    # Генераторы рисуют 400x300; ближайший сосед сохраняет резкие края и шум
+    img = cv2.resize(TEST_IMAGES[name](), (width, height), interpolation=cv2.INTER_NEAREST)
+    if dtype == "uint16":
+        # 0..255 -> 0..65535
+        img = img.astype(np.uint16) * 257
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR) if channels == 3 else img
+
+
+def measure(path, method, repeat):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(path=path, method=method, repeat=repeat)],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(row):
+    # В прежних прогонах без dtype был только uint8
+    return (row["size"], row["input"], row.get("dtype", "uint8"), row["image"], row["method"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="список ШxВ через запятую")
+    parser.add_argument("--methods", default=",".join(METHODS))
+    parser.add_argument("--images", default=",".join(TEST_IMAGES))
+    parser.add_argument("--inputs", default=",".join(INPUTS), help="gray (H, W) и/или bgr (H, W, 3)")
+    parser.add_argument("--dtypes", default=",".join(DTYPES), help="uint8 и/или uint16")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default="bench_methods.json")
+    parser.add_argument("--compare", metavar="JSON", help="прежние результаты для сравнения")
+    args = parser.parse_args()
+
+    methods = args.methods.split(",")
+    images = args.images.split(",")
+    inputs = args.inputs.split(",")
+    dtypes = args.dtypes.split(",")
+    for value, allowed in ((methods, METHODS), (images, TEST_IMAGES), (inputs, INPUTS), (dtypes, DTYPES)):
+        unknown = set(value) - set(allowed)
+        if unknown:
+            parser.error(f"неизвестные значения: {', '.join(sorted(unknown))}")
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = {result_key(row): row for row in json.load(f)["results"]}
+
+    results = []
+    print(f"{'размер':>11} {'вход':>4} {'тип':>6} {'изобр.':>12} {'метод':>17} "
+          f"{'холодн., мс':>11} {'тёпл., мс':>10} {'Мп/с':>8} {'пик, МБ':>8}"
+          + (f" {'к прежнему':>10}" if previous else ""))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes.split(","):
+            width, height = map(int, size.split("x"))
+            for kind in inputs:
+                for dtype in dtypes:
+                    for name in images:
+                        path = os.path.join(tmp, f"{name}.npy")
+                        np.save(path, make_image(name, width, height, 3 if kind == "bgr" else 1, dtype))
+                        for method in methods:
+                            row = {"size": size, "width": width, "height": height, "input": kind,
+                                   "dtype": dtype, "image": name, "method": method,
+                                   **measure(path, method, args.repeat)}
+                            row["mpix_per_s"] = width * height / 1e6 / (row["warm_ms"] / 1000)
+                            results.append(row)
+                            line = (f"{size:>11} {kind:>4} {dtype:>6} {name:>12} {method:>17} "
+                                    f"{row['cold_ms']:11.1f} {row['warm_ms']:10.1f} "
+                                    f"{row['mpix_per_s']:8.1f} {row['peak_mb']:8.1f}")
+                            old = previous.get(result_key(row))
+                            if old:
+                                line += f" {row['warm_ms'] / old['warm_ms']:10.2f}"
+                            print(line)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Результаты: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
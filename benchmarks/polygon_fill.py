@@ -0,0 +1,69 @@
+"""Масштабирование заливки polygon_spans по числу вершин.
+
+Два семейства многоугольников радиуса RADIUS: выпуклый (правильный
+N-угольник, на строке два пересечения) и звезда с зубцами (пересечений
+на строке — порядка числа зубцов). Время делится на E + K, где E —
+число рёбер, K — суммарное число пересечений строк с рёбрами: при
+почти линейной работе это отношение не растёт с N.
+
+    python benchmarks/polygon_fill.py [--repeat 3]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kg.raster import polygon_spans
+
+RADIUS = 2000
+SIZES = (1_000, 4_000, 16_000, 64_000)
+
+
+def regular(n):
+    return [(round(RADIUS * math.cos(2 * math.pi * k / n)), round(RADIUS * math.sin(2 * math.pi * k / n)))
+            for k in range(n)]
+
+
+def star(n, teeth=50):
+    # Зубцы глубиной в десятую радиуса; число пересечений на строке не растёт с n
+    return [(round(r * math.cos(2 * math.pi * k / n)), round(r * math.sin(2 * math.pi * k / n)))
+            for k in range(n)
+            for r in [RADIUS * (1 - 0.1 * (k * teeth * 2 // n % 2))]]
+
+
+def crossings(vertices):
+    return sum(abs(y2 - y1) for (_, y1), (_, y2) in zip(vertices, vertices[1:] + vertices[:1]))
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'фигура':>10} {'вершин':>7} {'правило':>8} {'серий':>7} {'E + K':>9} {'время, мс':>10} {'нс на E + K':>12}")
+    for name, make in (("выпуклая", regular), ("звезда", star)):
+        for n in SIZES:
+            vertices = make(n)
+            work = len(vertices) + crossings(vertices)
+            for rule in ("evenodd", "nonzero"):
+                spans = polygon_spans(vertices, rule)
+                dt = best_time(lambda: polygon_spans(vertices, rule), args.repeat)
+                print(f"{name:>10} {n:>7} {rule:>8} {len(spans):>7} {work:>9} {dt * 1000:10.1f} "
+                      f"{dt / work * 1e9:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
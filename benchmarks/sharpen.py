@@ -0,0 +1,78 @@
+"""Производительность повышения резкости: прежний код против SharpenEngine.
+
+Прежний вариант — ядро 3x3 собирается на каждый вызов, filter2D и лишняя
+копия np.clip(...).astype. Проверяется совпадение бит в бит при
+параметрах по умолчанию.
+
+    python benchmarks/sharpen.py [--size 7680x4320] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from kg.image import SharpenEngine
+
+
+def legacy_sharpen(img):
+    kernel = np.array([
+        [-1, -1, -1],
+        [-1,  9, -1],
+        [-1, -1, -1]
+    ], dtype=np.float32)
+
+    sharpened = cv2.filter2D(img, -1, kernel)
+    return np.clip(sharpened, 0, 255).astype(np.uint8)
+
+
+def legacy_unsharp(img, amount, radius):
+    # То же нерезкое маскирование одним filter2D с полным ядром (2r+1)^2
+    size = 2 * radius + 1
+    kernel = np.full((size, size), -amount / (size * size), dtype=np.float32)
+    kernel[radius, radius] += 1 + amount
+    return cv2.filter2D(img, -1, kernel)
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="7680x4320", help="ШxВ тестового изображения")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    width, height = map(int, args.size.split("x"))
+    img = np.random.default_rng(0).integers(0, 256, (height, width), dtype=np.uint8)
+    mpix = width * height / 1e6
+
+    engine = SharpenEngine()
+    out = np.empty_like(img)
+    exact = np.array_equal(engine.apply(img), legacy_sharpen(img))
+    print(f"{width}x{height}, совпадение с прежним кодом: {'да' if exact else 'НЕТ'}")
+
+    rows = [("прежний 3x3", lambda: legacy_sharpen(img)),
+            ("engine r=1", lambda: engine.apply(img, out))]
+    for radius in (2, 3, 5, 10):
+        e = SharpenEngine(radius=radius)
+        rows.append((f"filter2D r={radius}", lambda r=radius: legacy_unsharp(img, 9.0, r)))
+        rows.append((f"engine r={radius}", lambda e=e: e.apply(img, out)))
+    for name, func in rows:
+        dt = best_time(func, args.repeat)
+        print(f"{name:<16} {dt * 1000:8.1f} мс  {mpix / dt:8.1f} Мп/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Алгоритмы лабораторных работ: цветовые модели, обработка изображений, растровая графика.
+
+Подмодули загружаются при первом обращении (kg.color, kg.image, kg.raster),
+поэтому ``import kg`` ничего тяжёлого не тянет; tkinter, cv2 и PIL пакетом
+не импортируются вовсе, кроме cv2 внутри функций kg.image.
+"""
+import importlib
+
+__all__ = ["color", "framebuffer", "image", "palette", "pipeline", "raster", "tiles", "video"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,130 @@
+"""Пакетная обработка каталогов изображений методами из 2lab.py без GUI.
+
+    python -m kg.batch photos/ out/ --method threshold_otsu --workers 8
+
+Уже обработанные файлы (есть в out/) пропускаются, поэтому прерванный
+запуск можно просто повторить.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+from kg.image import METHODS, apply_method, to_gray
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+def find_images(in_dir):
+    for dirpath, _, filenames in os.walk(in_dir):
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, name)
+
+
+def output_path(path, in_dir, out_dir, ext=None):
+    rel = os.path.relpath(path, in_dir)
+    if ext:
+        rel = os.path.splitext(rel)[0] + ext
+    return os.path.join(out_dir, rel)
+
+
+def _init_worker():
+    import cv2
+    # Параллелизм даёт пул процессов; потоки OpenCV внутри него только мешают
+    cv2.setNumThreads(1)
+
+
+def process_file(src, dst, method, thresh, window=15):
+    """Читает, обрабатывает и пишет одно изображение; возвращает число пикселей.
+
+    Если файл не читается или результат не записывается — ValueError с путём.
+    """
+    import cv2
+    img = cv2.imread(src)
+    if img is None:
+        raise ValueError(f"Не удалось прочитать {src}")
+    result = apply_method(to_gray(img), method, thresh, window)
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    # Запись через временный файл: после прерывания не останется обрезанных результатов
+    root, ext = os.path.splitext(dst)
+    tmp = f"{root}.part{ext}"
+    if not cv2.imwrite(tmp, result):
+        raise ValueError(f"Не удалось записать {dst}")
+    os.replace(tmp, dst)
+    return result.shape[0] * result.shape[1]
+
+
+def run(in_dir, out_dir, method, thresh=127, workers=None, ext=None, window=15, log=print):
+    workers = workers or os.cpu_count() or 1
+    jobs = []
+    skipped = 0
+    for src in find_images(in_dir):
+        dst = output_path(src, in_dir, out_dir, ext)
+        if os.path.exists(dst):
+            skipped += 1
+        else:
+            jobs.append((src, dst))
+    log(f"К обработке: {len(jobs)}, уже готово: {skipped}, процессов: {workers}")
+
+    import multiprocessing
+
+    done = failed = pixels = 0
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        # В работе не больше 2 * workers файлов: у каждого процесса есть
+        # следующий файл наготове, но очередь не растёт без предела
+        pending = deque()
+        jobs_iter = iter(jobs)
+        while True:
+            while len(pending) < 2 * workers:
+                job = next(jobs_iter, None)
+                if job is None:
+                    break
+                pending.append((job[0], pool.apply_async(process_file, (*job, method, thresh, window))))
+            if not pending:
+                break
+            src, async_result = pending.popleft()
+            try:
+                n = async_result.get()
+            except Exception as e:
+                n = 0
+                log(f"Ошибка {src}: {e}")
+            if n:
+                done += 1
+                pixels += n
+            else:
+                failed += 1
+    dt = time.perf_counter() - t0
+    report = {
+        "done": done,
+        "failed": failed,
+        "skipped": skipped,
+        "seconds": dt,
+        "images_per_s": done / dt if dt else 0.0,
+        "mpix_per_s": pixels / 1e6 / dt if dt else 0.0,
+    }
+    log(f"Готово: {done}, ошибок: {failed}, пропущено: {skipped} за {dt:.2f} с — "
+        f"{report['images_per_s']:.1f} изобр/с, {report['mpix_per_s']:.1f} Мп/с")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная обработка изображений (резкость, пороги)")
+    parser.add_argument("in_dir")
+    parser.add_argument("out_dir")
+    parser.add_argument("--method", choices=METHODS, default="sharpen")
+    parser.add_argument("--threshold", type=int, default=127, help="порог для threshold_manual")
+    parser.add_argument("--window", type=int, default=15, help="окно для threshold_mean/threshold_sauvola")
+    parser.add_argument("--workers", type=int, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument("--ext", help="расширение результатов, например .png (по умолчанию как у исходника)")
+    args = parser.parse_args(argv)
+
+    report = run(args.in_dir, args.out_dir, args.method, args.threshold, args.workers, args.ext,
+                 args.window)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+
+# Конвертации RGB <-> HSV
+def rgb_to_hsv(r, g, b):
+    r_p, g_p, b_p = r / 255.0, g / 255.0, b / 255.0
+    c_max, c_min = max(r_p, g_p, b_p), min(r_p, g_p, b_p)
+    delta = c_max - c_min
+    h = 0
+    s = 0
+    v = c_max
+    if delta != 0:
+        s = delta / c_max
+        if c_max == r_p:
+            h = 60 * (((g_p - b_p) / delta) % 6)
+        elif c_max == g_p:
+            h = 60 * ((b_p - r_p) / delta + 2)
+        else:
+            h = 60 * ((r_p - g_p) / delta + 4)
+    return int(round(h)), int(round(s * 100)), int(round(v * 100))
+
+def hsv_to_rgb(h, s, v):
+    s /= 100.0
+    v /= 100.0
+    c = v * s
+    x = c * (1 - abs((h / 60) % 2 - 1))
+    m = v - c
+    r_p = g_p = b_p = 0
+    if 0 <= h < 60: r_p, g_p, b_p = c, x, 0
+    elif 60 <= h < 120: r_p, g_p, b_p = x, c, 0
+    elif 120 <= h < 180: r_p, g_p, b_p = 0, c, x
+    elif 180 <= h < 240: r_p, g_p, b_p = 0, x, c
+    elif 240 <= h < 300: r_p, g_p, b_p = x, 0, c
+    elif 300 <= h < 360: r_p, g_p, b_p = c, 0, x
+    r = int(round((r_p + m) * 255))
+    g = int(round((g_p + m) * 255))
+    b = int(round((b_p + m) * 255))
+    return r, g, b
+
+# Конвертации RGB <-> CMYK
+def rgb_to_cmyk(r, g, b):
+    if r == g == b == 0:
+        return 0, 0, 0, 100
+    r_p, g_p, b_p = r / 255.0, g / 255.0, b / 255.0
+    k = 1 - max(r_p, g_p, b_p)
+    c = (1 - r_p - k) / (1 - k)
+    m = (1 - g_p - k) / (1 - k)
+    y = (1 - b_p - k) / (1 - k)
+    return int(round(c * 100)), int(round(m * 100)), int(round(y * 100)), int(round(k * 100))
+
+def cmyk_to_rgb(c, m, y, k):
+    r = 255 * (1 - c / 100) * (1 - k / 100)
+    g = 255 * (1 - m / 100) * (1 - k / 100)
+    b = 255 * (1 - y / 100) * (1 - k / 100)
+    return int(round(r)), int(round(g)), int(round(b))
+
+# Пакетные версии конвертаций для массивов NumPy.
+# Принимают массивы формы (N, 3)/(N, 4) или целые изображения (H, W, 3),
+# каналы по последней оси. Порядок операций повторяет скалярные функции,
+# поэтому округление (к чётному, как у round) совпадает с ними.
+def rgb_to_hsv_array(rgb):
+    rgb = np.asarray(rgb)
+    p = rgb.astype(np.float64) / 255.0
+    r_p, g_p, b_p = p[..., 0], p[..., 1], p[..., 2]
+    c_max, c_min = p.max(axis=-1), p.min(axis=-1)
+    delta = c_max - c_min
+    nonzero = delta != 0
+    safe_delta = np.where(nonzero, delta, 1.0)
+    s = np.where(nonzero, delta / np.where(nonzero, c_max, 1.0), 0.0)
+    h = np.select(
+        [~nonzero, c_max == r_p, c_max == g_p],
+        [0.0,
+         60 * (((g_p - b_p) / safe_delta) % 6),
+         60 * ((b_p - r_p) / safe_delta + 2)],
+        60 * ((r_p - g_p) / safe_delta + 4))
+    out = np.empty(rgb.shape[:-1] + (3,), dtype=np.uint16)
+    out[..., 0] = np.round(h)
+    out[..., 1] = np.round(s * 100)
+    out[..., 2] = np.round(c_max * 100)
+    return out
+
+def hsv_to_rgb_array(hsv):
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h = hsv[..., 0]
+    s = hsv[..., 1] / 100.0
+    v = hsv[..., 2] / 100.0
+    c = v * s
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+    m = v - c
+    # Номер сектора 0..5; вне [0, 360) все компоненты нулевые, как в скалярной версии
+    sector = np.select([(0 <= h) & (h < 60), (60 <= h) & (h < 120),
+                        (120 <= h) & (h < 180), (180 <= h) & (h < 240),
+                        (240 <= h) & (h < 300), (300 <= h) & (h < 360)],
+                       [0, 1, 2, 3, 4, 5], -1)
+    zero = np.zeros_like(c)
+    r_p = np.select([(sector == 0) | (sector == 5), (sector == 1) | (sector == 4)], [c, x], zero)
+    g_p = np.select([(sector == 1) | (sector == 2), (sector == 0) | (sector == 3)], [c, x], zero)
+    b_p = np.select([(sector == 3) | (sector == 4), (sector == 2) | (sector == 5)], [c, x], zero)
+    out = np.empty(hsv.shape[:-1] + (3,), dtype=np.uint8)
+    out[..., 0] = np.round((r_p + m) * 255)
+    out[..., 1] = np.round((g_p + m) * 255)
+    out[..., 2] = np.round((b_p + m) * 255)
+    return out
+
+def rgb_to_cmyk_array(rgb):
+    rgb = np.asarray(rgb)
+    p = rgb.astype(np.float64) / 255.0
+    k = 1 - p.max(axis=-1)
+    black = k == 1
+    denom = np.where(black, 1.0, 1 - k)
+    out = np.empty(rgb.shape[:-1] + (4,), dtype=np.uint8)
+    for i in range(3):
+        out[..., i] = np.where(black, 0, np.round((1 - p[..., i] - k) / denom * 100))
+    out[..., 3] = np.round(k * 100)
+    return out
+
+def cmyk_to_rgb_array(cmyk):
+    cmyk = np.asarray(cmyk, dtype=np.float64)
+    k_p = 1 - cmyk[..., 3] / 100
+    out = np.empty(cmyk.shape[:-1] + (3,), dtype=np.uint8)
+    for i in range(3):
+        out[..., i] = np.round(255 * (1 - cmyk[..., i] / 100) * k_p)
+    return out
+
+# Таблицы подстановки (LUT) для всех 2^24 целых RGB.
+# Строятся один раз векторизованными функциями, сохраняются в .npy и дальше
+# открываются через memmap: конвертация сводится к одной выборке по индексу,
+# а процессы-воркеры делят одни и те же страницы файла.
+LUT_VERSION = 1
+LUT_CHUNK = 1 << 20
+# имя таблицы -> (тип, функция, срез каналов её результата)
+LUT_TABLES = {
+    "hsv_h": (np.uint16, rgb_to_hsv_array, slice(0, 1)),
+    "hsv_sv": (np.uint8, rgb_to_hsv_array, slice(1, 3)),
+    "cmyk": (np.uint8, rgb_to_cmyk_array, slice(0, 4)),
+}
+
+def rgb_index(rgb):
+    rgb = np.asarray(rgb)
+    return ((rgb[..., 0].astype(np.uint32) << 16)
+            | (rgb[..., 1].astype(np.uint32) << 8)
+            | rgb[..., 2].astype(np.uint32))
+
+class ColorLUT:
+    def __init__(self, lut_dir="color_lut"):
+        self.lut_dir = lut_dir
+        self._tables = {}
+
+    def _path(self, name):
+        return os.path.join(self.lut_dir, f"rgb_{name}_v{LUT_VERSION}.npy")
+
+    def _build(self, name):
+        dtype, func, channels = LUT_TABLES[name]
+        os.makedirs(self.lut_dir, exist_ok=True)
+        path = self._path(name)
+        # Пишем во временный файл и переименовываем, чтобы параллельные
+        # процессы никогда не открыли недостроенную таблицу
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        table = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype,
+                                          shape=(1 << 24, channels.stop - channels.start))
+        for start in range(0, 1 << 24, LUT_CHUNK):
+            idx = np.arange(start, start + LUT_CHUNK, dtype=np.uint32)
+            rgb = np.stack([idx >> 16, (idx >> 8) & 0xFF, idx & 0xFF], axis=-1)
+            table[start:start + LUT_CHUNK] = func(rgb)[:, channels]
+        table.flush()
+        del table
+        os.replace(tmp_path, path)
+
+    def _table(self, name):
+        table = self._tables.get(name)
+        if table is None:
+            path = self._path(name)
+            if not os.path.exists(path):
+                self._build(name)
+            table = np.load(path, mmap_mode="r")
+            self._tables[name] = table
+        return table
+
+    def build_all(self):
+        for name in LUT_TABLES:
+            self._table(name)
+
+    def rgb_to_hsv(self, rgb):
+        # H (0..360) хранится в uint16, S и V (0..100) — в uint8
+        h = self._table("hsv_h")
+        sv = self._table("hsv_sv")
+        idx = rgb_index(rgb)
+        out = np.empty(idx.shape + (3,), dtype=np.uint16)
+        out[..., 0] = h[idx, 0]
+        out[..., 1:] = sv[idx]
+        return out
+
+    def rgb_to_cmyk(self, rgb):
+        cmyk = self._table("cmyk")
+        return cmyk[rgb_index(rgb)]
@@ -0,0 +1,170 @@
+"""Потоковая конвертация цветов без GUI.
+
+    python -m kg.color_cli --from hex --to hsv < colors.txt
+    python -m kg.color_cli --from rgb --to cmyk --format jsonl -i in.jsonl -o out.jsonl --workers 4
+"""
+import argparse
+import itertools
+import json
+import sys
+from collections import deque
+
+import numpy as np
+
+from kg.color import (ColorLUT, rgb_to_hsv_array, hsv_to_rgb_array,
+                      rgb_to_cmyk_array, cmyk_to_rgb_array)
+
+SPACES = ("rgb", "hsv", "cmyk", "hex")
+CHANNELS = {"rgb": 3, "hsv": 3, "cmyk": 4, "hex": 3}
+FORMATS = ("csv", "jsonl")
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+# Допустимые значения каналов: вне их приведение к uint8 молча заворачивает цвет.
+# Оттенок не ограничен — вне [0, 360) hsv_to_rgb даёт чёрный, как скалярная версия
+RANGES = {
+    "rgb": ((0, 0, 0), (255, 255, 255)),
+    "hsv": ((-np.inf, 0, 0), (np.inf, 100, 100)),
+    "cmyk": ((0, 0, 0, 0), (100, 100, 100, 100)),
+}
+
+
+def parse_chunk(lines, space, fmt, start=1):
+    """Строки чанка -> массив (N, каналы); start — номер первой строки для сообщений об ошибках."""
+    numbered = [(start + i, line.strip()) for i, line in enumerate(lines) if line.strip()]
+    n = CHANNELS[space]
+    if not numbered:
+        return np.empty((0, n))
+    if space == "hex":
+        digits = []
+        for number, line in numbered:
+            value = line[1:] if line.startswith("#") else line
+            if len(value) != 6 or not HEX_DIGITS.issuperset(value):
+                raise ValueError(f"строка {number}: ожидается #RRGGBB, получено {line!r}")
+            digits.append(value)
+        return np.frombuffer(bytes.fromhex("".join(digits)), dtype=np.uint8).reshape(-1, 3)
+    if fmt == "csv":
+        for number, line in numbered:
+            if line.count(",") != n - 1:
+                raise ValueError(f"строка {number}: ожидается {n} значений {space}, получено: {line}")
+        arr = np.loadtxt([line for _, line in numbered], delimiter=",", dtype=np.float64, ndmin=2)
+    else:
+        rows = []
+        for number, line in numbered:
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"строка {number}: {e}") from e
+            if isinstance(item, dict):
+                item = [item.get(ch) for ch in space]
+            if not isinstance(item, list) or len(item) != n or None in item:
+                raise ValueError(f"строка {number}: ожидается {n} значений {space}, получено: {line}")
+            rows.append(item)
+        arr = np.asarray(rows, dtype=np.float64)
+    lo, hi = RANGES[space]
+    bad = ~((arr >= lo) & (arr <= hi)).all(axis=1)
+    if bad.any():
+        number, line = numbered[int(np.argmax(bad))]
+        raise ValueError(f"строка {number}: значения {space} вне диапазона: {line}")
+    return arr
+
+
+def format_chunk(arr, space, fmt):
+    if len(arr) == 0:
+        return ""
+    if space == "hex":
+        h = np.asarray(arr, dtype=np.uint8).tobytes().hex().upper()
+        return "".join(f"#{h[i:i + 6]}\n" for i in range(0, len(h), 6))
+    if fmt == "csv":
+        return "".join(",".join(map(str, row)) + "\n" for row in arr.tolist())
+    return "".join(json.dumps(row) + "\n" for row in arr.tolist())
+
+
+def convert(arr, src, dst, lut=None):
+    if src == "hsv":
+        rgb = hsv_to_rgb_array(arr)
+    elif src == "cmyk":
+        rgb = cmyk_to_rgb_array(arr)
+    else:
+        rgb = arr
+    if dst == "hsv":
+        return lut.rgb_to_hsv(rgb) if lut is not None else rgb_to_hsv_array(rgb)
+    if dst == "cmyk":
+        return lut.rgb_to_cmyk(rgb) if lut is not None else rgb_to_cmyk_array(rgb)
+    return np.asarray(rgb).astype(np.uint8)
+
+
+# Состояние процесса-воркера: LUT открывается один раз на процесс через memmap
+_worker_lut = None
+
+
+def _init_worker(lut_dir):
+    global _worker_lut
+    _worker_lut = ColorLUT(lut_dir) if lut_dir else None
+
+
+def convert_chunk(lines, src, dst, fmt, start=1):
+    arr = parse_chunk(lines, src, fmt, start)
+    return format_chunk(convert(arr, src, dst, _worker_lut), dst, fmt)
+
+
+def read_chunks(stream, size):
+    while True:
+        lines = list(itertools.islice(stream, size))
+        if not lines:
+            return
+        yield lines
+
+
+def run(inp, out, src, dst, fmt="csv", chunk_size=65536, workers=1, lut_dir=None):
+    # (номер первой строки, строки) — чтобы ошибка указывала строку входа
+    chunks = ((1 + i * chunk_size, lines) for i, lines in enumerate(read_chunks(inp, chunk_size)))
+    if workers <= 1:
+        _init_worker(lut_dir)
+        for start, lines in chunks:
+            out.write(convert_chunk(lines, src, dst, fmt, start))
+        return
+
+    import multiprocessing
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(lut_dir,)) as pool:
+        # Не больше 2 * workers чанков в работе, чтобы не читать весь вход в память;
+        # результаты пишутся в исходном порядке
+        pending = deque()
+        for start, lines in chunks:
+            pending.append(pool.apply_async(convert_chunk, (lines, src, dst, fmt, start)))
+            if len(pending) >= 2 * workers:
+                out.write(pending.popleft().get())
+        while pending:
+            out.write(pending.popleft().get())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная конвертация цветов RGB/HSV/CMYK/HEX")
+    parser.add_argument("--from", dest="src", choices=SPACES, required=True, help="исходное пространство")
+    parser.add_argument("--to", dest="dst", choices=SPACES, required=True, help="целевое пространство")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="формат строк для rgb/hsv/cmyk (hex всегда по одному #RRGGBB в строке)")
+    parser.add_argument("-i", "--input", help="входной файл (по умолчанию stdin)")
+    parser.add_argument("-o", "--output", help="выходной файл (по умолчанию stdout)")
+    parser.add_argument("--chunk", type=int, default=65536, help="строк в одном чанке")
+    parser.add_argument("--workers", type=int, default=1, help="число процессов")
+    parser.add_argument("--lut", metavar="DIR", help="использовать таблицы подстановки из каталога")
+    args = parser.parse_args(argv)
+
+    inp = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        run(inp, out, args.src, args.dst, args.format, args.chunk, args.workers, args.lut)
+    except (ValueError, KeyError) as e:
+        print(f"Ошибка конвертации: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.input:
+            inp.close()
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
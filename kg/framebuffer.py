@@ -0,0 +1,71 @@
+"""Кадровый буфер для растровых алгоритмов: одна RGB-ячейка на клетку сетки.
+
+Алгоритмы пишут в массив NumPy, а GUI выводит его одной картинкой
+(to_ppm), вместо того чтобы создавать элемент холста на каждый пиксель.
+Координаты — как у сетки 3lab.py: x вправо, y вверх, клетка (x, y)
+занимает [x, x + 1) x [y, y + 1).
+"""
+import numpy as np
+
+BACKGROUND = (255, 255, 255)
+
+
+def parse_color(color):
+    """'#rrggbb' или (r, g, b) -> (r, g, b)."""
+    if isinstance(color, str):
+        color = color.lstrip("#")
+        return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+    return tuple(color)
+
+
+class FrameBuffer:
+    def __init__(self, xmin, xmax, ymin, ymax, background=BACKGROUND):
+        self.xmin, self.xmax = xmin, xmax
+        self.ymin, self.ymax = ymin, ymax
+        self.width = xmax - xmin
+        self.height = ymax - ymin
+        # В том же порядке, что view у алгоритмов kg.raster
+        self.bounds = (xmin, ymin, xmax, ymax)
+        self.background = parse_color(background)
+        self.pixels = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.clear()
+
+    def clear(self):
+        self.pixels[:] = self.background
+        self.dirty = True
+
+    def set(self, x, y, color):
+        if self.xmin <= x < self.xmax and self.ymin <= y < self.ymax:
+            # Строка 0 — верх сетки
+            self.pixels[self.ymax - 1 - y, x - self.xmin] = parse_color(color)
+            self.dirty = True
+
+    def plot(self, points, color):
+        """Закрашивает список (x, y) одним цветом; точки вне сетки отбрасываются."""
+        if not len(points):
+            return
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        xs, ys = pts[:, 0], pts[:, 1]
+        inside = (xs >= self.xmin) & (xs < self.xmax) & (ys >= self.ymin) & (ys < self.ymax)
+        self.pixels[self.ymax - 1 - ys[inside], xs[inside] - self.xmin] = parse_color(color)
+        self.dirty = True
+
+    def span(self, x, y, length, horizontal, color):
+        """Серия из length клеток от (x, y) вправо или вверх — один срез массива."""
+        if horizontal:
+            if not self.ymin <= y < self.ymax:
+                return
+            lo, hi = max(x, self.xmin), min(x + length, self.xmax)
+            if lo < hi:
+                self.pixels[self.ymax - 1 - y, lo - self.xmin:hi - self.xmin] = parse_color(color)
+        else:
+            if not self.xmin <= x < self.xmax:
+                return
+            lo, hi = max(y, self.ymin), min(y + length, self.ymax)
+            if lo < hi:
+                self.pixels[self.ymax - hi:self.ymax - lo, x - self.xmin] = parse_color(color)
+        self.dirty = True
+
+    def to_ppm(self):
+        # Бинарный PPM (P6) Tk читает без PIL: PhotoImage(data=...)
+        return f"P6 {self.width} {self.height} 255\n".encode() + self.pixels.tobytes()
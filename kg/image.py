@@ -0,0 +1,373 @@
+import hashlib
+import os
+import threading
+from fractions import Fraction
+
+import numpy as np
+
+# cv2 импортируется внутри функций: сам импорт OpenCV занимает сотни миллисекунд,
+# а модуль нужен и там, где до обработки изображений дело не доходит
+
+
+def to_gray(img):
+    import cv2
+    if img.ndim == 2:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def content_hash(img):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.shape}{img.dtype}".encode())
+    h.update(np.ascontiguousarray(img).data)
+    return h.hexdigest()
+
+
+SHARPEN_KERNEL = np.array([
+    [-1, -1, -1],
+    [-1,  9, -1],
+    [-1, -1, -1]
+], dtype=np.float32)
+
+
+class SharpenEngine:
+    """Нерезкое маскирование: out = c + amount * (c - среднее в окне (2r+1)^2).
+
+    Ядро SHARPEN_KERNEL — частный случай radius=1, amount=9 (10c минус сумма
+    3x3). Для radius=1 ядро собирается один раз и идёт в один filter2D прямо
+    в uint8 с насыщением; для больших радиусов свёртка раскладывается на
+    box-фильтр без нормировки (стоимость не зависит от радиуса) и целочисленную
+    арифметику: amount = p / q, out = ((q + p)·N·c − p·S) / (q·N) с
+    округлением, где S — сумма окна из N пикселей, и одно насыщающее
+    приведение к типу входа (uint8 или uint16) в конце. Среднее не округляется до вычитания, поэтому
+    результат совпадает с точной формулой до единицы. Буферы сумм
+    переиспользуются между вызовами, поэтому один объект нельзя делить между
+    потоками.
+    """
+
+    def __init__(self, amount=9.0, radius=1):
+        self.amount = amount
+        self.radius = radius
+        size = 2 * radius + 1
+        self.ksize = (size, size)
+        self.kernel = None
+        if radius == 1:
+            self.kernel = np.full(self.ksize, -amount / (size * size), dtype=np.float32)
+            self.kernel[radius, radius] += 1 + amount
+        # amount как дробь p / q для целочисленной ветки
+        ratio = Fraction(amount).limit_denominator(1000)
+        self._p, self._q = ratio.numerator, ratio.denominator
+        self._sum = self._num = None
+
+    def apply(self, img, out=None):
+        import cv2
+        if self.kernel is not None:
+            return cv2.filter2D(img, -1, self.kernel, dst=out)
+        if img.dtype not in (np.uint8, np.uint16):
+            raise ValueError(f"Ожидается uint8 или uint16, получено {img.dtype}")
+        top = np.iinfo(img.dtype).max
+        n = self.ksize[0] * self.ksize[1]
+        p, q = self._p, self._q
+        # int32 хватает, пока (q + p)·N·top не переполняет его; иначе int64.
+        # Сумма окна — в int32, пока N·top помещается, иначе в float64 (точно до 2^53)
+        dtype = np.int32 if top * (abs(p) + q) * n + q * n < 2 ** 31 else np.int64
+        sum_dtype = np.int32 if top * n < 2 ** 31 else np.float64
+        if (self._sum is None or self._sum.shape != img.shape
+                or self._sum.dtype != sum_dtype or self._num.dtype != dtype):
+            self._sum = np.empty(img.shape, dtype=sum_dtype)
+            self._num = np.empty(img.shape, dtype=dtype)
+        total, num = self._sum, self._num
+        cv2.boxFilter(img, cv2.CV_32S if sum_dtype is np.int32 else cv2.CV_64F, self.ksize,
+                      dst=total, normalize=False)
+        # Всё на месте в переиспользуемых буферах, без временных массивов
+        np.multiply(img, (q + p) * n, out=num, dtype=dtype)
+        if dtype is np.int32:
+            np.multiply(total, p, out=total)
+            num -= total
+        else:
+            num -= total.astype(np.int64) * p
+        # Деление с округлением половины вверх: floor((x + d/2) / d)
+        num += q * n // 2
+        num //= q * n
+        np.clip(num, 0, top, out=num)
+        if out is None:
+            out = np.empty_like(img)
+        np.copyto(out, num, casting="unsafe")
+        return out
+
+
+_sharpen_engines = threading.local()
+
+
+def apply_sharpen(img, amount=9.0, radius=1, out=None):
+    # Свой набор движков (и буферов) на каждый поток
+    engines = getattr(_sharpen_engines, "engines", None)
+    if engines is None:
+        engines = _sharpen_engines.engines = {}
+    engine = engines.get((amount, radius))
+    if engine is None:
+        engine = engines[(amount, radius)] = SharpenEngine(amount, radius)
+    return engine.apply(img, out)
+
+
+def threshold_manual(gray, thresh):
+    import cv2
+    _, result = cv2.threshold(gray, thresh, 255, cv2.THRESH_BINARY)
+    return result
+
+
+def threshold_otsu(gray):
+    import cv2
+    _, result = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return result
+
+
+def window_stats(gray, window):
+    """Среднее и стандартное отклонение в окне window x window вокруг каждого пикселя.
+
+    Считается через интегральные изображения суммы и суммы квадратов: четыре
+    выборки на пиксель при любом размере окна. У краёв окно обрезается.
+    """
+    import cv2
+    total, squares = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    h, w = gray.shape
+    r = window // 2
+    d = 2 * r + 1
+    count = np.outer(np.minimum(np.arange(h) + r + 1, h) - np.maximum(np.arange(h) - r, 0),
+                     np.minimum(np.arange(w) + r + 1, w) - np.maximum(np.arange(w) - r, 0))
+
+    def box(integral):
+        # Дополнение краевыми значениями обрезает окно у границ, а сами
+        # четыре угла окна берутся срезами без копирования
+        p = np.pad(integral, r, mode="edge")
+        return p[d:d + h, d:d + w] - p[:h, d:d + w] - p[d:d + h, :w] + p[:h, :w]
+
+    mean = box(total) / count
+    var = box(squares) / count - mean ** 2
+    return mean, np.sqrt(np.maximum(var, 0))
+
+
+def threshold_local_mean(gray, window=15, offset=5):
+    mean, _ = window_stats(gray, window)
+    return np.where(gray > mean - offset, 255, 0).astype(np.uint8)
+
+
+def threshold_sauvola(gray, window=15, k=0.2, r=128):
+    # T = m * (1 + k * (s / R - 1))
+    mean, std = window_stats(gray, window)
+    return np.where(gray > mean * (1 + k * (std / r - 1)), 255, 0).astype(np.uint8)
+
+
+METHODS = ("sharpen", "threshold_manual", "threshold_otsu", "threshold_mean", "threshold_sauvola")
+
+
+def apply_method(gray, method, thresh=127, window=15):
+    if method == "sharpen":
+        return apply_sharpen(gray)
+    if method == "threshold_manual":
+        return threshold_manual(gray, thresh)
+    if method == "threshold_otsu":
+        return threshold_otsu(gray)
+    if method == "threshold_mean":
+        return threshold_local_mean(gray, window)
+    if method == "threshold_sauvola":
+        return threshold_sauvola(gray, window)
+    raise ValueError(f"Неизвестный метод: {method}")
+
+
+# Генераторы тестовых изображений (оттенки серого, uint8)
+def create_blurry():
+    import cv2
+    img = np.zeros((300, 400), dtype=np.uint8)
+    cv2.rectangle(img, (50, 50), (350, 250), 200, -1)
+    cv2.circle(img, (200, 150), 80, 100, -1)
+    return cv2.GaussianBlur(img, (15, 15), 0)
+
+
+def create_low_contrast():
+    import cv2
+    img = np.zeros((300, 400), dtype=np.uint8)
+    cv2.rectangle(img, (50, 50), (350, 250), 120, -1)
+    cv2.circle(img, (200, 150), 80, 60, -1)
+    return img
+
+
+def create_noisy(seed=0):
+    import cv2
+    img = np.zeros((300, 400), dtype=np.uint8)
+    cv2.rectangle(img, (80, 80), (320, 220), 255, -1)
+    cv2.circle(img, (200, 150), 60, 0, -1)
+    # Фиксированное зерно: шум одинаков от запуска к запуску
+    noise = np.random.default_rng(seed).normal(0, 25, img.shape)
+    return np.clip(img.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+# Версия генераторов выше: при их изменении увеличить, чтобы старые файлы
+# на диске не подхватывались
+TEST_IMAGES_VERSION = 1
+TEST_IMAGES = {
+    "blurry": create_blurry,
+    "low_contrast": create_low_contrast,
+    "noisy": create_noisy,
+}
+_test_images = {}
+
+
+def test_image_path(name, cache_dir):
+    return os.path.join(cache_dir, f"{name}_test_v{TEST_IMAGES_VERSION}.png")
+
+
+def load_test_image(name, cache_dir=None):
+    """Тестовое изображение по имени: из памяти, с диска или сгенерированное.
+
+    Генерация происходит только при первом обращении. Если задан cache_dir,
+    готовый файл нужной версии читается с диска, а новый сохраняется туда
+    (PNG без потерь, так что с диска приходит то же, что сгенерировано).
+    """
+    if name not in _test_images:
+        img = None
+        if cache_dir:
+            import cv2
+            path = test_image_path(name, cache_dir)
+            if os.path.exists(path):
+                img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                img = TEST_IMAGES[name]()
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp = f"{path}.part.png"
+                if cv2.imwrite(tmp, img):
+                    os.replace(tmp, path)
+        else:
+            img = TEST_IMAGES[name]()
+        _test_images[name] = img
+    return _test_images[name]
+
+
+def otsu_threshold(histogram):
+    """Порог Otsu по готовой 256-бинной гистограмме (как cv2.THRESH_OTSU)."""
+    p = histogram.astype(np.float64) / histogram.sum()
+    levels = np.arange(256)
+    w0 = np.cumsum(p)
+    mu = np.cumsum(p * levels)
+    mu_total = mu[-1]
+    w1 = 1.0 - w0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu_total * w0 - mu) ** 2 / (w0 * w1)
+    between[~np.isfinite(between)] = 0.0
+    return int(np.argmax(between))
+
+
+class ThresholdEngine:
+    """Бинаризация через гистограмму и 256-элементные LUT.
+
+    Гистограмма считается один раз; доля переднего плана для любого порога —
+    O(1), применение порога — одна выборка по LUT. Для предпросмотра при
+    перетаскивании есть уменьшенная копия изображения.
+    """
+
+    PREVIEW_MAX_SIDE = 512
+
+    def __init__(self, gray, histogram=None):
+        import cv2
+        self.gray = gray
+        self.histogram = histogram if histogram is not None else np.bincount(gray.ravel(), minlength=256)
+        self.total = int(self.histogram.sum())
+        # above[t] — число пикселей ярче t (они станут 255 при THRESH_BINARY)
+        self._above = self.total - np.cumsum(self.histogram)
+        self._luts = {}
+        self._otsu = None
+        h, w = gray.shape[:2]
+        scale = self.PREVIEW_MAX_SIDE / max(h, w)
+        if scale < 1:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            self.preview_gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        else:
+            self.preview_gray = gray
+
+    def foreground_fraction(self, thresh):
+        thresh = int(np.clip(thresh, 0, 255))
+        return self._above[thresh] / self.total if self.total else 0.0
+
+    def lut(self, thresh):
+        table = self._luts.get(thresh)
+        if table is None:
+            table = np.where(np.arange(256) > thresh, 255, 0).astype(np.uint8)
+            self._luts[thresh] = table
+        return table
+
+    def apply(self, thresh, preview=False):
+        import cv2
+        src = self.preview_gray if preview else self.gray
+        return cv2.LUT(src, self.lut(int(thresh)))
+
+    @property
+    def otsu(self):
+        if self._otsu is None:
+            self._otsu = otsu_threshold(self.histogram)
+        return self._otsu
+
+    def apply_otsu(self, preview=False):
+        return self.apply(self.otsu, preview)
+
+
+class ImageCache:
+    """Производные данные одного изображения. Создаётся заново при загрузке нового."""
+
+    def __init__(self, img):
+        self.img = img
+        self._gray = None
+        self._histogram = None
+        self._previews = {}
+        self._last_key = None
+        self._last_result = None
+        self._thresholds = None
+        self._hash = None
+        # Кэш читают и GUI, и фоновый поток
+        self._lock = threading.RLock()
+
+    @property
+    def gray(self):
+        with self._lock:
+            if self._gray is None:
+                self._gray = to_gray(self.img)
+            return self._gray
+
+    @property
+    def content_hash(self):
+        with self._lock:
+            if self._hash is None:
+                self._hash = content_hash(self.img)
+            return self._hash
+
+    @property
+    def histogram(self):
+        with self._lock:
+            if self._histogram is None:
+                self._histogram = np.bincount(self.gray.ravel(), minlength=256)
+            return self._histogram
+
+    @property
+    def thresholds(self):
+        with self._lock:
+            if self._thresholds is None:
+                self._thresholds = ThresholdEngine(self.gray, self.histogram)
+            return self._thresholds
+
+    @property
+    def thresholds_ready(self):
+        return self._thresholds is not None
+
+    def preview(self, size):
+        # Уменьшенная RGB-копия исходника для показа
+        if size not in self._previews:
+            import cv2
+            img = self.img if self.img.ndim == 2 else cv2.cvtColor(self.img, cv2.COLOR_BGR2RGB)
+            self._previews[size] = cv2.resize(img, size)
+        return self._previews[size]
+
+    def result(self, key, compute):
+        # Результат последнего метода: повторный вызов с тем же ключом не пересчитывается
+        if key != self._last_key:
+            self._last_result = compute(self.gray)
+            self._last_key = key
+        return self._last_result
@@ -0,0 +1,131 @@
+"""Поиск ближайшего цвета палитры.
+
+    index = PaletteIndex(load_palette("corporate.txt"), space="hsv")
+    idx, dist = index.query(rgb_pixels)               # точно
+    idx, dist = index.query(rgb_pixels, exact=False)  # по сетке, O(1) на цвет
+"""
+import numpy as np
+
+from kg.color import rgb_to_hsv_array
+
+# Области признакового пространства: RGB как есть, HSV как цилиндр
+# (S·cos H, S·sin H, V), чтобы оттенки 359 и 0 были рядом
+SPACE_BOUNDS = {
+    "rgb": (np.array([0.0, 0.0, 0.0]), np.array([255.0, 255.0, 255.0])),
+    "hsv": (np.array([-100.0, -100.0, 0.0]), np.array([100.0, 100.0, 100.0])),
+}
+
+
+def features(rgb, space="rgb"):
+    rgb = np.asarray(rgb).reshape(-1, 3)
+    if space == "rgb":
+        return rgb.astype(np.float64)
+    hsv = rgb_to_hsv_array(rgb).astype(np.float64)
+    h = np.radians(hsv[:, 0])
+    return np.stack([hsv[:, 1] * np.cos(h), hsv[:, 1] * np.sin(h), hsv[:, 2]], axis=-1)
+
+
+def load_palette(path):
+    """Строки вида ``#RRGGBB [имя]``; возвращает (массив RGB (N, 3), список имён)."""
+    colors, names = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split(maxsplit=1)
+            if not parts:
+                continue
+            hex_code = parts[0].lstrip("#")
+            colors.append([int(hex_code[i:i + 2], 16) for i in (0, 2, 4)])
+            names.append(parts[1].strip() if len(parts) > 1 else f"#{hex_code.upper()}")
+    return np.array(colors, dtype=np.uint8).reshape(-1, 3), names
+
+
+class PaletteIndex:
+    def __init__(self, palette_rgb, space="rgb", bins=32):
+        if space not in SPACE_BOUNDS:
+            raise ValueError(f"Неизвестное пространство: {space}")
+        self.palette = np.asarray(palette_rgb, dtype=np.uint8).reshape(-1, 3)
+        if len(self.palette) == 0:
+            raise ValueError("Пустая палитра")
+        self.space = space
+        self.bins = bins
+        self.lo, self.hi = SPACE_BOUNDS[space]
+        self.cell_size = (self.hi - self.lo) / bins
+        self.points = features(self.palette, space)
+        self._p2 = (self.points ** 2).sum(axis=1)
+        self._half_diag = np.linalg.norm(self.cell_size) / 2
+        self._nearest_to_center = None
+        self._candidates = {}
+
+    def _cells(self, feats):
+        ijk = np.floor((feats - self.lo) / self.cell_size).astype(np.int64)
+        ijk = np.clip(ijk, 0, self.bins - 1)
+        return (ijk[:, 0] * self.bins + ijk[:, 1]) * self.bins + ijk[:, 2]
+
+    def _cell_centers(self, cells):
+        i, rest = np.divmod(cells, self.bins * self.bins)
+        j, k = np.divmod(rest, self.bins)
+        return self.lo + (np.stack([i, j, k], axis=-1) + 0.5) * self.cell_size
+
+    def _block_size(self, width):
+        return max(1, (1 << 21) // width)
+
+    def _center_distances(self, centers):
+        # |c - p|^2 = |c|^2 - 2 c·p + |p|^2 одним матричным умножением
+        d2 = (centers ** 2).sum(axis=1)[:, None] - 2 * centers @ self.points.T + self._p2
+        return np.sqrt(np.maximum(d2, 0))
+
+    def _scan(self, cells):
+        # Для блока клеток: ближайший к центру цвет и список кандидатов — цветов,
+        # которые могут оказаться ближайшими хоть для одной точки клетки.
+        # Для x в клетке |x - c| <= h (полудиагональ), значит ближайший к x
+        # цвет p удовлетворяет |c - p| <= min_q |c - q| + 2h
+        slack = 2 * self._half_diag + 1e-9
+        step = self._block_size(len(self.points))
+        for start in range(0, len(cells), step):
+            block = cells[start:start + step]
+            d = self._center_distances(self._cell_centers(block))
+            mask = d <= d.min(axis=1, keepdims=True) + slack
+            for cell, row in zip(block.tolist(), mask):
+                self._candidates[cell] = np.flatnonzero(row)
+            yield start, d.argmin(axis=1)
+
+    def build(self):
+        """Строит сетку целиком; без вызова клетки считаются лениво при запросах."""
+        if self._nearest_to_center is None:
+            nearest = np.empty(self.bins ** 3, dtype=np.int64)
+            for start, block_nearest in self._scan(np.arange(self.bins ** 3)):
+                nearest[start:start + len(block_nearest)] = block_nearest
+            self._nearest_to_center = nearest
+        return self
+
+    def query(self, rgb, exact=True):
+        """Индексы ближайших цветов палитры и расстояния до них в выбранном пространстве."""
+        rgb = np.asarray(rgb)
+        shape = rgb.shape[:-1]
+        if rgb.size == 0:
+            return np.empty(shape, dtype=np.int64), np.empty(shape, dtype=np.float64)
+        feats = features(rgb, self.space)
+        cells = self._cells(feats)
+        if exact:
+            # Списки кандидатов занятых клеток дополняются до общей длины
+            # фиктивной точкой на бесконечности, дальше всё считается блоками
+            uniq, inverse = np.unique(cells, return_inverse=True)
+            missing = np.array([c for c in uniq.tolist() if c not in self._candidates], dtype=np.int64)
+            for _ in self._scan(missing):
+                pass
+            lists = [self._candidates[c] for c in uniq.tolist()]
+            width = max(len(c) for c in lists)
+            padded = np.full((len(uniq), width), len(self.points), dtype=np.int64)
+            for row, cand in zip(padded, lists):
+                row[:len(cand)] = cand
+            points = np.vstack([self.points, np.full((1, 3), np.inf)])
+            idx = np.empty(len(feats), dtype=np.int64)
+            step = self._block_size(width)
+            for start in range(0, len(feats), step):
+                cand = padded[inverse[start:start + step]]
+                d2 = ((feats[start:start + step, None, :] - points[cand]) ** 2).sum(axis=-1)
+                idx[start:start + step] = cand[np.arange(len(cand)), d2.argmin(axis=1)]
+        else:
+            idx = self.build()._nearest_to_center[cells]
+        dist = np.sqrt(((feats - self.points[idx]) ** 2).sum(axis=-1))
+        return idx.reshape(shape), dist.reshape(shape)
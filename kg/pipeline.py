@@ -0,0 +1,155 @@
+"""Конвейер фильтров из методов kg.image.
+
+    pipeline = Pipeline.parse("gray > sharpen > threshold(thresh=120)")
+    result = pipeline.run(img)
+
+Каждый этап кэшируется по хэшу содержимого входа и параметрам, поэтому при
+смене параметра последнего этапа пересчитывается только он. Соседние
+поточечные этапы (threshold, invert, gamma) сливаются в одну 256-элементную
+LUT и выполняются за один проход. Пороговым этапам (otsu, mean, sauvola)
+нужно серое изображение: если перед ними нет gray, он вставляется сам.
+"""
+import hashlib
+import re
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from kg.image import (apply_sharpen, content_hash, threshold_local_mean,
+                      threshold_otsu, threshold_sauvola, to_gray)
+
+# func(img, **params) — обычный этап; lut(**params) — поточечный этап,
+# задаётся таблицей на 256 значений; gray — этапу нужен одноканальный вход
+Stage = namedtuple("Stage", "func lut defaults gray", defaults=(False,))
+
+
+def _threshold_lut(thresh):
+    return np.where(np.arange(256) > thresh, 255, 0).astype(np.uint8)
+
+
+def _invert_lut():
+    return (255 - np.arange(256)).astype(np.uint8)
+
+
+def _gamma_lut(gamma):
+    return np.round(255 * (np.arange(256) / 255) ** gamma).astype(np.uint8)
+
+
+STAGES = {
+    "gray": Stage(to_gray, None, {}),
+    "sharpen": Stage(apply_sharpen, None, {"amount": 9.0, "radius": 1}),
+    "threshold": Stage(None, _threshold_lut, {"thresh": 127}),
+    "otsu": Stage(threshold_otsu, None, {}, gray=True),
+    "mean": Stage(threshold_local_mean, None, {"window": 15, "offset": 5}, gray=True),
+    "sauvola": Stage(threshold_sauvola, None, {"window": 15, "k": 0.2, "r": 128}, gray=True),
+    "invert": Stage(None, _invert_lut, {}),
+    "gamma": Stage(None, _gamma_lut, {"gamma": 1.0}),
+}
+
+_STAGE_RE = re.compile(r"^\s*(\w+)\s*(?:\((.*)\))?\s*$")
+
+
+def _parse_value(text):
+    text = text.strip()
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    raise ValueError(f"Некорректное значение параметра: {text}")
+
+
+class StageCache:
+    """LRU-кэш результатов этапов: ключ -> изображение."""
+
+    def __init__(self, max_items=16):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+class Pipeline:
+    def __init__(self, stages, cache=None):
+        self.stages = []
+        for name, params in stages:
+            if name not in STAGES:
+                raise ValueError(f"Неизвестный этап: {name}")
+            unknown = set(params) - set(STAGES[name].defaults)
+            if unknown:
+                raise ValueError(f"Лишние параметры этапа {name}: {', '.join(sorted(unknown))}")
+            self.stages.append((name, {**STAGES[name].defaults, **params}))
+        names = [name for name, _ in self.stages]
+        first = next((i for i, name in enumerate(names) if STAGES[name].gray), None)
+        if first is not None and "gray" not in names[:first]:
+            self.stages.insert(first, ("gray", {}))
+        self.cache = cache if cache is not None else StageCache()
+
+    @classmethod
+    def parse(cls, text, cache=None):
+        """Разбирает запись вида ``gray > sharpen > threshold(thresh=120)``."""
+        stages = []
+        for part in text.split(">"):
+            match = _STAGE_RE.match(part)
+            if not match:
+                raise ValueError(f"Некорректный этап: {part.strip()}")
+            name, args = match.groups()
+            params = {}
+            for arg in filter(str.strip, (args or "").split(",")):
+                key, sep, value = arg.partition("=")
+                if not sep:
+                    raise ValueError(f"Параметр без значения: {arg.strip()}")
+                params[key.strip()] = _parse_value(value)
+            stages.append((name, params))
+        return cls(stages, cache)
+
+    def __str__(self):
+        return " > ".join(
+            name + (f"({', '.join(f'{k}={v}' for k, v in params.items())})" if params else "")
+            for name, params in self.stages)
+
+    def groups(self):
+        # Соседние поточечные этапы объединяются в одну группу
+        groups = []
+        for name, params in self.stages:
+            pointwise = STAGES[name].lut is not None
+            if pointwise and groups and groups[-1][0]:
+                groups[-1][1].append((name, params))
+            else:
+                groups.append((pointwise, [(name, params)]))
+        return groups
+
+    def run(self, img, img_hash=None):
+        key = img_hash or content_hash(img)
+        data = img
+        for pointwise, stages in self.groups():
+            key = hashlib.blake2b(f"{key}|{stages!r}".encode(), digest_size=16).hexdigest()
+            cached = self.cache.get(key)
+            if cached is not None:
+                data = cached
+                continue
+            if pointwise:
+                import cv2
+                table = np.arange(256, dtype=np.uint8)
+                for name, params in stages:
+                    table = STAGES[name].lut(**params)[table]
+                data = cv2.LUT(data, table)
+            else:
+                name, params = stages[0]
+                data = STAGES[name].func(data, **params)
+            self.cache.put(key, data)
+        return data
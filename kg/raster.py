@@ -0,0 +1,904 @@
+import math
+import time
+
+
+def clip_segment(x1, y1, x2, y2, xmin, ymin, xmax, ymax):
+    """Лианг–Барски: параметры (t0, t1) части отрезка внутри прямоугольника или None."""
+    t0, t1 = 0.0, 1.0
+    dx, dy = x2 - x1, y2 - y1
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return None
+            t1 = min(t1, t)
+    return t0, t1
+
+
+def visible_steps(x1, y1, x2, y2, view):
+    """Диапазон [i0, i1] шагов по ведущей оси, пиксели которых могут попасть в view.
+
+    view = (xmin, ymin, xmax, ymax), видимы клетки xmin <= x < xmax,
+    ymin <= y < ymax. На шаге i точка идеального отрезка имеет параметр
+    i / n, а пиксель отстоит от неё меньше чем на 1 — отсюда запас в клетку.
+    """
+    xmin, ymin, xmax, ymax = view
+    clip = clip_segment(x1, y1, x2, y2, xmin - 1, ymin - 1, xmax, ymax)
+    if clip is None:
+        return None
+    n = max(abs(x2 - x1), abs(y2 - y1))
+    t0, t1 = clip
+    return max(0, math.floor(t0 * n) - 1), min(n, math.ceil(t1 * n) + 1)
+
+
+def in_view(points, view):
+    xmin, ymin, xmax, ymax = view
+    return [(x, y) for x, y in points if xmin <= x < xmax and ymin <= y < ymax]
+
+
+# Все алгоритмы ниже принимают необязательный view: тогда считаются только
+# шаги из visible_steps и возвращаются только видимые пиксели, так что
+# работа зависит от видимой части, а не от длины отрезка
+
+def step_by_step_line(x1, y1, x2, y2, view=None):
+    points = []
+
+    dx = x2 - x1
+    dy = y2 - y1
+
+    if dx == 0 and dy == 0:
+        return in_view([(x1, y1)], view) if view else [(x1, y1)]
+
+    steps = visible_steps(x1, y1, x2, y2, view) if view else (0, max(abs(dx), abs(dy)))
+    if steps is None:
+        return []
+    i0, i1 = steps
+
+    if abs(dx) >= abs(dy):
+        k = dy / dx
+        b = y1 - k * x1
+        step = 1 if x2 >= x1 else -1
+        for i in range(i0, i1 + 1):
+            x = x1 + step * i
+            y = k * x + b
+            points.append((int(round(x)), int(round(y))))
+    else:
+        k = dx / dy
+        b = x1 - k * y1
+        step = 1 if y2 >= y1 else -1
+        for i in range(i0, i1 + 1):
+            y = y1 + step * i
+            x = k * y + b
+            points.append((int(round(x)), int(round(y))))
+
+    return in_view(points, view) if view else points
+
+
+def dda_line(x1, y1, x2, y2, view=None):
+    points = []
+
+    dx = x2 - x1
+    dy = y2 - y1
+
+    steps = int(max(abs(dx), abs(dy)))
+    if steps == 0:
+        return in_view([(x1, y1)], view) if view else [(x1, y1)]
+
+    visible = visible_steps(x1, y1, x2, y2, view) if view else (0, steps)
+    if visible is None:
+        return []
+    i0, i1 = visible
+
+    x_inc = dx / steps
+    y_inc = dy / steps
+
+    if view:
+        # При отсечении точка шага i берётся по формуле x1 + i * x_inc, чтобы
+        # не проходить отрезок от начала; накопленная сумма ниже отличается
+        # от неё ошибкой округления float, поэтому на границах округления
+        # пиксель может не совпасть с неотсечённым отрезком
+        for i in range(i0, i1 + 1):
+            points.append((int(round(x1 + i * x_inc)), int(round(y1 + i * y_inc))))
+        return in_view(points, view)
+
+    x = x1
+    y = y1
+    for _ in range(steps + 1):
+        points.append((int(round(x)), int(round(y))))
+        x += x_inc
+        y += y_inc
+
+    return points
+
+
+def _minor_steps(i, a, b):
+    # Сколько шагов по второй оси сделал Брезенхем за i шагов по ведущей
+    # (a — длина по ведущей оси, b — по второй): ceil((2ib - a) / 2a), не меньше 0
+    return max(0, -((a - 2 * i * b) // (2 * a))) if a else 0
+
+
+def bresenham_line(x1, y1, x2, y2, view=None):
+    points = []
+
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+
+    steps = visible_steps(x1, y1, x2, y2, view) if view else (0, max(dx, dy))
+    if steps is None:
+        return []
+    i0, i1 = steps
+
+    # Состояние после i0 шагов — в замкнутом виде, без прохода от начала
+    minor = _minor_steps(i0, max(dx, dy), min(dx, dy))
+    moved_x, moved_y = (i0, minor) if dx >= dy else (minor, i0)
+    err = dx - dy - moved_x * dy + moved_y * dx
+
+    x, y = x1 + sx * moved_x, y1 + sy * moved_y
+    for _ in range(i1 - i0 + 1):
+        points.append((x, y))
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+
+    return in_view(points, view) if view else points
+
+
+class _Moves:
+    """Строка ходов как дерево повторов, без построения самой строки.
+
+    Лист — один ход ("s" или "d"), узел — склейка частей (узел, число
+    повторов, обращена ли часть). Известны длина и число диагональных ходов
+    каждого узла, поэтому счёт ходов в префиксе и выдача подстроки спускаются
+    по дереву: глубина — число шагов алгоритма Евклида, O(log n).
+    """
+    __slots__ = ("parts", "move", "length", "diagonals")
+
+    def __init__(self, parts=(), move=None):
+        self.parts = parts
+        self.move = move
+        if move is not None:
+            self.length, self.diagonals = 1, int(move == "d")
+        else:
+            self.length = sum(node.length * reps for node, reps, _ in parts)
+            self.diagonals = sum(node.diagonals * reps for node, reps, _ in parts)
+
+    def _ordered(self, rev):
+        # Обращённая склейка — те же части в обратном порядке, каждая обращена
+        # (флаг части складывается с rev у вызывающего)
+        return reversed(self.parts) if rev else self.parts
+
+    def count(self, i, rev=False):
+        """Число диагональных ходов среди первых i."""
+        total = 0
+        node = self
+        while i and node.move is None:
+            for child, reps, flip in node._ordered(rev):
+                size = child.length * reps
+                if i >= size:
+                    total += child.diagonals * reps
+                    i -= size
+                    continue
+                full, i = divmod(i, child.length)
+                total += child.diagonals * full
+                node, rev = child, rev != flip
+                break
+        return total + (node.diagonals if i else 0)
+
+    def text(self, lo=0, hi=None, rev=False, memo=None):
+        """Ходы с lo по hi - 1; работа пропорциональна длине результата и глубине."""
+        hi = self.length if hi is None else hi
+        memo = {} if memo is None else memo
+        if lo == 0 and hi == self.length:
+            if self not in memo:
+                memo[self] = self.move or "".join(child.text(rev=flip, memo=memo) * reps
+                                                   for child, reps, flip in self.parts)
+            return memo[self][::-1] if rev else memo[self]
+        pieces = []
+        pos = 0
+        for child, reps, flip in self._ordered(rev):
+            size = child.length * reps
+            a, b = max(lo, pos) - pos, min(hi, pos + size) - pos
+            pos += size
+            if a >= b:
+                continue
+            first, last = a // child.length, (b - 1) // child.length
+            flip = rev != flip
+            if first == last:
+                offset = first * child.length
+                pieces.append(child.text(a - offset, b - offset, flip, memo))
+                continue
+            pieces.append(child.text(a - first * child.length, child.length, flip, memo))
+            if last - first > 1:
+                pieces.append(child.text(rev=flip, memo=memo) * (last - first - 1))
+            pieces.append(child.text(0, b - last * child.length, flip, memo))
+        return "".join(pieces)
+
+
+_STRAIGHT, _DIAGONAL = _Moves(move="s"), _Moves(move="d")
+
+
+def _repeat_moves(a, b, k):
+    # Результат k-кратного b = a + reversed(b) без k копирований строки:
+    # чётное k даёт a^(k/2) b rev(a)^(k/2), нечётное — a^((k+1)/2) rev(b) rev(a)^((k-1)/2)
+    half = k // 2
+    if k % 2 == 0:
+        return _Moves([(a, half, False), (b, 1, False), (a, half, True)])
+    return _Moves([(a, half + 1, False), (b, 1, True), (a, half, True)])
+
+
+def _castle_pitway_tree(a, b):
+    # Алгоритм Евклида над (a - b, b), повторные вычитания свёрнуты в деление
+    if b == 0:
+        return _Moves([(_STRAIGHT, a, False)])
+    if a == b:
+        return _Moves([(_DIAGONAL, a, False)])
+    x, y = a - b, b
+    m1, m2 = _STRAIGHT, _DIAGONAL
+    while x != y:
+        if x > y:
+            k = (x - 1) // y
+            x -= k * y
+            m2 = _repeat_moves(m1, m2, k)
+        else:
+            k = (y - 1) // x
+            y -= k * x
+            m1 = _repeat_moves(m2, m1, k)
+    return _Moves([(_Moves([(m2, 1, False), (m1, 1, True)]), x, False)])
+
+
+def castle_pitway_moves(a, b):
+    """Строка ходов Касла–Питтвея для отрезка (0, 0) -> (a, b), 0 <= b <= a.
+
+    "s" — шаг по ведущей оси, "d" — диагональный шаг. Строка строится
+    алгоритмом Евклида над (a - b, b), повторные вычитания сворачиваются
+    в одно деление, поэтому работа линейна по длине результата.
+    """
+    return _castle_pitway_tree(a, b).text()
+
+
+def _clip_span(start, minor, length, horizontal, view):
+    xmin, ymin, xmax, ymax = view
+    lo_m, hi_m, lo_s, hi_s = (ymin, ymax, xmin, xmax) if horizontal else (xmin, xmax, ymin, ymax)
+    if not lo_m <= minor < hi_m:
+        return None
+    lo, hi = max(start, lo_s), min(start + length, hi_s)
+    if lo >= hi:
+        return None
+    return (lo, minor, hi - lo) if horizontal else (minor, lo, hi - lo)
+
+
+def castle_pitway_spans(x1, y1, x2, y2, view=None):
+    """Отрезок как серии пикселей вдоль ведущей оси.
+
+    Возвращает (spans, horizontal): spans — список (x, y, length), серия
+    идёт от (x, y) на length пикселей вправо при horizontal, иначе вверх.
+    Серии идут от (x1, y1) к (x2, y2). Набор пикселей совпадает с
+    bresenham_line: строка ходов берётся в обратном порядке, чтобы при
+    равноудалённых кандидатах выбор был тот же.
+
+    С view строка целиком не строится: из дерева ходов алгоритма Евклида
+    берутся только ходы с шага i0 по i1 из visible_steps, смещение по второй
+    оси к шагу i0 — число диагональных ходов до него. Оба запроса спускаются
+    по дереву за O(log n), так что работа зависит от видимой части.
+    """
+    dx, dy = x2 - x1, y2 - y1
+    horizontal = abs(dx) >= abs(dy)
+    if horizontal:
+        major, minor, a, b = x1, y1, abs(dx), abs(dy)
+        s_major, s_minor = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+    else:
+        major, minor, a, b = y1, x1, abs(dy), abs(dx)
+        s_major, s_minor = (1 if dy > 0 else -1), (1 if dx > 0 else -1)
+
+    spans = []
+    i0, i1 = 0, a
+    if view is not None:
+        steps = visible_steps(x1, y1, x2, y2, view)
+        if steps is None:
+            return spans, horizontal
+        i0, i1 = steps
+    # Ход с номером i ведёт из пикселя шага i в пиксель шага i + 1
+    tree = _castle_pitway_tree(a, b)
+    major += s_major * i0
+    minor += s_minor * tree.count(i0, rev=True)
+    for run in tree.text(i0, i1, rev=True).split("d"):
+        length = len(run) + 1
+        end = major + s_major * (length - 1)
+        start = min(major, end)
+        span = (start, minor, length) if horizontal else (minor, start, length)
+        if view is not None:
+            span = _clip_span(start, minor, length, horizontal, view)
+        if span is not None:
+            spans.append(span)
+        major = end + s_major
+        minor += s_minor
+    return spans, horizontal
+
+
+def castle_pitway_line(x1, y1, x2, y2, view=None):
+    """Пиксели серий castle_pitway_spans по порядку обхода от (x1, y1) к (x2, y2)."""
+    spans, horizontal = castle_pitway_spans(x1, y1, x2, y2, view)
+    # Серии хранятся от меньшей координаты; при обходе влево или вниз
+    # каждая выдаётся с конца
+    forward = x2 >= x1 if horizontal else y2 >= y1
+    points = []
+    for x, y, length in spans:
+        steps = range(length) if forward else range(length - 1, -1, -1)
+        points.extend((x + i, y) if horizontal else (x, y + i) for i in steps)
+    return points
+
+
+def bresenham_circle(xc, yc, r, view=None):
+    if view is not None:
+        return _circle_in_view(xc, yc, r, view)
+
+    points = []
+
+    x = 0
+    y = r
+    d = 3 - 2 * r
+
+    while x <= y:
+        for sx, sy, swap in _OCTANTS:
+            if not _is_duplicate(x, y, sx, sy, swap):
+                u, v = (y, x) if swap else (x, y)
+                points.append((xc + sx * u, yc + sy * v))
+        if d < 0:
+            d = d + 4 * x + 6
+        else:
+            d = d + 4 * (x - y) + 10
+            y -= 1
+        x += 1
+
+    return points
+
+
+# Восемь отражений дуги октанта (x, y): знаки по осям и перестановка x/y,
+# в порядке (x, y), (-x, y), (x, -y), (-x, -y), (y, x), (-y, x), (y, -x), (-y, -x)
+_OCTANTS = [(sx, sy, swap) for swap in (False, True) for sy in (1, -1) for sx in (1, -1)]
+
+
+def _is_duplicate(x, y, sx, sy, swap):
+    # Отражения совпадают только на осях (нулевая координата не меняется от
+    # знака) и на диагонали x == y (перестановка ничего не меняет), причём в
+    # пределах одного шага — пропускаем их сразу вместо удаления повторов
+    u, v = (y, x) if swap else (x, y)
+    return (sx < 0 and u == 0) or (sy < 0 and v == 0) or (swap and x == y)
+
+
+def _circle_y(r, x):
+    # y, который алгоритм выше выбирает для данного x в первом октанте:
+    # наименьший y с y^2 + (y + 1)^2 >= 2(r^2 - x^2)
+    t = 2 * (r * r - x * x)
+    y = max(0, (math.isqrt(max(0, 2 * t - 1)) - 1) // 2)
+    while y * y + (y + 1) ** 2 < t:
+        y += 1
+    while y > 0 and (y - 1) ** 2 + y * y >= t:
+        y -= 1
+    return y
+
+
+def _axis_range(center, sign, lo, hi):
+    # Значения u >= 0, при которых center + sign * u лежит в [lo, hi)
+    if sign > 0:
+        return max(0, lo - center), hi - 1 - center
+    return max(0, center - hi + 1), center - lo
+
+
+def _circle_in_view(xc, yc, r, view):
+    """Окружность с отсечением: каждый октант проходится только на видимом участке.
+
+    Октант пропускается целиком, если его дуга не пересекает view; для
+    остальных начало дуги (y и переменная решения) берётся в замкнутом
+    виде, так что работа пропорциональна видимым пикселям.
+    """
+    xmin, ymin, xmax, ymax = view
+    if xc + r < xmin or xc - r >= xmax or yc + r < ymin or yc - r >= ymax:
+        return []
+    points = []
+    for sx, sy, swap in _OCTANTS:
+        u_lo, u_hi = _axis_range(xc, sx, xmin, xmax)
+        v_lo, v_hi = _axis_range(yc, sy, ymin, ymax)
+        (x_lo, x_hi), (y_lo, y_hi) = ((v_lo, v_hi), (u_lo, u_hi)) if swap else ((u_lo, u_hi), (v_lo, v_hi))
+        if y_lo > min(y_hi, r):
+            continue
+        # y отличается от sqrt(r^2 - x^2) меньше чем на 1
+        x_lo = max(x_lo, math.isqrt(max(0, r * r - (y_hi + 1) ** 2)))
+        x_hi = min(x_hi, math.isqrt(max(0, r * r - max(0, y_lo - 1) ** 2)) + 1)
+        x = x_lo
+        y = _circle_y(r, x)
+        d = 2 * (x + 1) ** 2 + y * y + (y - 1) ** 2 - 2 * r * r
+        while x <= y and x <= x_hi:
+            if not _is_duplicate(x, y, sx, sy, swap):
+                u, v = (y, x) if swap else (x, y)
+                points.append((xc + sx * u, yc + sy * v))
+            if d < 0:
+                d = d + 4 * x + 6
+            else:
+                d = d + 4 * (x - y) + 10
+                y -= 1
+            x += 1
+    return in_view(points, view)
+
+
+def _last_true(lo, hi, pred):
+    # Наибольшее x из [lo, hi] с pred(x) для монотонного pred (истина, потом ложь), иначе lo - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if pred(mid):
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return hi
+
+
+def _circle_half_width(r, v):
+    """Полуширина строки v (0 <= v <= r) контура bresenham_circle: наибольший u с пикселем (u, v)."""
+    # Последний шаг октанта и последний шаг, на котором y ещё не ниже v
+    x_end = _last_true(0, r, lambda x: x <= _circle_y(r, x))
+    x = _last_true(0, x_end, lambda x: _circle_y(r, x) >= v)
+    width = x if x >= 0 and _circle_y(r, x) == v else -1
+    # Отражённая часть октанта: пиксель (y_v, v) при v <= x_end
+    if v <= x_end:
+        width = max(width, _circle_y(r, v))
+    return width
+
+
+def _rows_in_view(yc, radius, view):
+    lo, hi = yc - radius, yc + radius
+    if view is not None:
+        lo, hi = max(lo, view[1]), min(hi, view[3] - 1)
+    return range(lo, hi + 1)
+
+
+def _clip_spans(spans, view):
+    if view is None:
+        return spans
+    return [span for span in (_clip_span(*span, True, view) for span in spans) if span is not None]
+
+
+def filled_circle_spans(xc, yc, r, view=None):
+    """Круг как горизонтальные серии (x, y, length), по одной на строку.
+
+    Края серий совпадают с контуром bresenham_circle. Полуширина каждой
+    строки находится двоичным поиском по замкнутой формуле _circle_y, так
+    что с view считаются только видимые строки.
+    """
+    if view is not None:
+        xmin, ymin, xmax, ymax = view
+        if xc + r < xmin or xc - r >= xmax or yc + r < ymin or yc - r >= ymax:
+            return []
+    spans = []
+    for y in _rows_in_view(yc, r, view):
+        width = _circle_half_width(r, abs(y - yc))
+        spans.append((xc - width, y, 2 * width + 1))
+    return _clip_spans(spans, view)
+
+
+def _ellipse_quadrant(a, b):
+    """Контур эллипса с полуосями a, b в первой четверти, средней точкой.
+
+    Точки идут от (0, b) к (a, 0) без повторов. Решающие переменные обеих
+    областей умножены на 4, чтобы считать в целых.
+    """
+    if a == 0 or b == 0:
+        return [(0, y) for y in range(b, -1, -1)] if a == 0 else [(x, 0) for x in range(a + 1)]
+    a2, b2 = a * a, b * b
+    x, y = 0, b
+    dx, dy = 0, 2 * a2 * y
+    points = []
+
+    # Область 1: наклон по модулю меньше 1, шаг по x
+    d1 = 4 * b2 - 4 * a2 * b + a2
+    while dx < dy:
+        points.append((x, y))
+        x += 1
+        dx += 2 * b2
+        if d1 < 0:
+            d1 += 4 * (dx + b2)
+        else:
+            y -= 1
+            dy -= 2 * a2
+            d1 += 4 * (dx - dy + b2)
+
+    # Область 2: шаг по y
+    d2 = b2 * (2 * x + 1) ** 2 + 4 * a2 * (y - 1) ** 2 - 4 * a2 * b2
+    while y >= 0:
+        points.append((x, y))
+        y -= 1
+        dy -= 2 * a2
+        if d2 > 0:
+            d2 += 4 * (a2 - dy)
+        else:
+            x += 1
+            dx += 2 * b2
+            d2 += 4 * (dx - dy + a2)
+    # У вытянутых эллипсов область 2 заканчивается раньше вершины (a, 0)
+    last_x = points[-1][0]
+    points.extend((x, 0) for x in range(last_x + 1, a + 1))
+    return points
+
+
+def _ellipse_y(a2, b2, x):
+    # y области 1 в столбце x: наименьший y с f(x, y + 1/2) >= 0,
+    # f(x, y) = b^2 x^2 + a^2 y^2 - a^2 b^2 (d1 — это 4 f(x + 1, y - 1/2))
+    t = 4 * b2 * (a2 - x * x)
+    y = max(0, (math.isqrt(max(0, t // a2)) - 1) // 2)
+    while a2 * (2 * y + 1) ** 2 < t:
+        y += 1
+    while y > 0 and a2 * (2 * y - 1) ** 2 >= t:
+        y -= 1
+    return y
+
+
+def _ellipse_x(a2, b2, y):
+    # x области 2 в строке y без учёта начала области: наибольший x с
+    # f(x - 1/2, y) <= 0 (d2 — это 4 f(x + 1/2, y - 1))
+    t = 4 * a2 * (b2 - y * y)
+    x = (math.isqrt(max(0, t // b2)) + 1) // 2
+    while b2 * (2 * x + 1) ** 2 <= t:
+        x += 1
+    while x > 0 and b2 * (2 * x - 1) ** 2 > t:
+        x -= 1
+    return x
+
+
+class _EllipseQuadrant:
+    """Четверть _ellipse_quadrant в замкнутом виде: любая точка за O(1).
+
+    Область 1 — столбцы 0 <= x < x_t с y = column(x), область 2 — строки
+    0 <= y <= y_t с x = row(y), и хвост (x, 0) до вершины (row(0), a].
+    За шаг рекуррентность меняет вторую координату не больше чем на 1,
+    поэтому y на границе областей и x в области 2 ограничиваются этим.
+    """
+
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+        self.a2, self.b2 = a * a, b * b
+        # Область 1 идёт, пока 2b^2 x < 2a^2 y
+        self.x_t = _last_true(0, a, lambda x: self.b2 * x < self.a2 * self._column_y(x)) + 1
+        self.y_t = self._column_y(self.x_t)
+
+    def _column_y(self, x):
+        if x == 0:
+            return self.b
+        return max(_ellipse_y(self.a2, self.b2, x), _ellipse_y(self.a2, self.b2, x - 1) - 1)
+
+    def column(self, x):
+        return _ellipse_y(self.a2, self.b2, x)
+
+    def row(self, y):
+        x_t, y_t = self.x_t, self.y_t
+        return max(x_t, min(_ellipse_x(self.a2, self.b2, y), x_t + y_t - y))
+
+    def width(self, y):
+        """Наибольший x четверти в строке y (0 <= y <= b)."""
+        if y == 0:
+            return max(self.a, self.row(0))
+        if y <= self.y_t:
+            return self.row(y)
+        # column(x) >= y, пока f(x, y - 1/2) < 0: 4b^2 x^2 < a^2 (4b^2 - (2y - 1)^2)
+        t = self.a2 * (4 * self.b2 - (2 * y - 1) ** 2)
+        x = math.isqrt(max(0, t // (4 * self.b2)))
+        while 4 * self.b2 * (x + 1) ** 2 < t:
+            x += 1
+        while x >= 0 and 4 * self.b2 * x * x >= t:
+            x -= 1
+        return min(self.x_t - 1, x)
+
+    def visible(self, u_lo, u_hi, v_lo, v_hi):
+        """Точки четверти с u_lo <= x <= u_hi и v_lo <= y <= v_hi; границы ищутся двоичным поиском."""
+        points = []
+        # Область 1: y не возрастает по x
+        lo, hi = max(0, u_lo), min(self.x_t - 1, u_hi)
+        lo = _last_true(lo, hi, lambda x: self.column(x) > v_hi) + 1
+        hi = _last_true(lo, hi, lambda x: self.column(x) >= v_lo)
+        points.extend((x, self.column(x)) for x in range(lo, hi + 1))
+        # Область 2: x не убывает при убывании y
+        lo, hi = max(0, v_lo), min(self.y_t, v_hi)
+        lo = _last_true(lo, hi, lambda y: self.row(y) > u_hi) + 1
+        hi = _last_true(lo, hi, lambda y: self.row(y) >= u_lo)
+        points.extend((self.row(y), y) for y in range(hi, lo - 1, -1))
+        # Хвост вдоль y = 0
+        if v_lo <= 0:
+            points.extend((x, 0) for x in range(max(self.row(0) + 1, u_lo), min(self.a, u_hi) + 1))
+        return points
+
+
+def _ellipse_outside(xc, yc, a, b, view):
+    xmin, ymin, xmax, ymax = view
+    return xc + a < xmin or xc - a >= xmax or yc + b < ymin or yc - b >= ymax
+
+
+def midpoint_ellipse(xc, yc, a, b, view=None):
+    """Контур эллипса алгоритмом средней точки, без повторяющихся пикселей.
+
+    Четверть отражается в четыре стороны; на осях (x == 0 или y == 0)
+    совпадающие отражения пропускаются сразу. С view каждая четверть
+    берётся в замкнутом виде только на видимом участке (_EllipseQuadrant),
+    так что работа пропорциональна видимым пикселям.
+    """
+    if view is not None:
+        return _ellipse_in_view(xc, yc, a, b, view)
+    points = []
+    for x, y in _ellipse_quadrant(a, b):
+        for sx, sy in ((1, 1), (-1, 1), (1, -1), (-1, -1)):
+            if (sx < 0 and x == 0) or (sy < 0 and y == 0):
+                continue
+            points.append((xc + sx * x, yc + sy * y))
+    return points
+
+
+def _ellipse_in_view(xc, yc, a, b, view):
+    if _ellipse_outside(xc, yc, a, b, view):
+        return []
+    xmin, ymin, xmax, ymax = view
+    if a == 0 or b == 0:
+        # Вырожденный эллипс — отрезок по оси
+        if a == 0:
+            return [(xc, y) for y in range(max(yc - b, ymin), min(yc + b, ymax - 1) + 1)]
+        return [(x, yc) for x in range(max(xc - a, xmin), min(xc + a, xmax - 1) + 1)]
+    quadrant = _EllipseQuadrant(a, b)
+    points = []
+    for sx, sy in ((1, 1), (-1, 1), (1, -1), (-1, -1)):
+        u_lo, u_hi = _axis_range(xc, sx, xmin, xmax)
+        v_lo, v_hi = _axis_range(yc, sy, ymin, ymax)
+        for x, y in quadrant.visible(u_lo, u_hi, v_lo, v_hi):
+            if (sx < 0 and x == 0) or (sy < 0 and y == 0):
+                continue
+            points.append((xc + sx * x, yc + sy * y))
+    return points
+
+
+def filled_ellipse_spans(xc, yc, a, b, view=None):
+    """Заполненный эллипс как горизонтальные серии (x, y, length), края — по midpoint_ellipse.
+
+    С view полуширина считается только для видимых строк (_EllipseQuadrant.width).
+    """
+    if view is not None:
+        if _ellipse_outside(xc, yc, a, b, view):
+            return []
+        if a == 0 or b == 0:
+            width = lambda v: a
+        else:
+            width = _EllipseQuadrant(a, b).width
+        spans = [(xc - width(abs(y - yc)), y, 2 * width(abs(y - yc)) + 1)
+                 for y in _rows_in_view(yc, b, view)]
+        return _clip_spans(spans, view)
+    # Точки четверти идут с неубывающим x, так что последняя в строке — самая широкая
+    widths = [0] * (b + 1)
+    for x, y in _ellipse_quadrant(a, b):
+        widths[y] = x
+    return [(xc - widths[abs(y - yc)], y, 2 * widths[abs(y - yc)] + 1)
+            for y in _rows_in_view(yc, b, None)]
+
+
+def polyline(vertices, line=bresenham_line, closed=False, view=None):
+    """Ломаная (closed=True — контур многоугольника) из отрезков алгоритмом line.
+
+    Общая вершина соседних отрезков выдаётся один раз: первая точка
+    следующего отрезка пропускается, если совпадает с последней выданной.
+    """
+    vertices = list(vertices)
+    if closed and len(vertices) > 2:
+        vertices.append(vertices[0])
+    points = []
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:]):
+        segment = line(x1, y1, x2, y2, view=view) if view is not None else line(x1, y1, x2, y2)
+        if points and segment and segment[0] == points[-1]:
+            segment = segment[1:]
+        points.extend(segment)
+    if closed and len(points) > 1 and points[-1] == points[0]:
+        points.pop()
+    if len(vertices) == 1:
+        points = in_view(vertices, view) if view is not None else vertices
+    return points
+
+
+FILL_RULES = ("evenodd", "nonzero")
+
+
+def polygon_spans(vertices, rule="evenodd", view=None):
+    """Заливка многоугольника строками: таблица рёбер и список активных рёбер.
+
+    Пиксель (x, y) закрашивается, если его центр внутри многоугольника по
+    правилу rule ("evenodd" — чёт-нечет, "nonzero" — ненулевой обход).
+    Ребро покрывает строки ymin <= y < ymax, поэтому общая вершина не
+    считается дважды, а горизонтальные рёбра не участвуют. Пересечения
+    считаются в целых: x = num / dy, num растёт на dx за строку. Работа —
+    O(E log E + число пересечений), с view — только по видимым строкам.
+    Возвращает серии (x, y, length).
+    """
+    if rule not in FILL_RULES:
+        raise ValueError(f"Неизвестное правило заливки: {rule}")
+    vertices = list(vertices)
+    # Таблица рёбер: (ymin, ymax, x в ymin, dx, dy, направление обхода)
+    edges = []
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]):
+        if y1 == y2:
+            continue
+        winding = 1 if y2 > y1 else -1
+        if y1 > y2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        edges.append((y1, y2, x1, x2 - x1, y2 - y1, winding))
+    if not edges:
+        return []
+    edges.sort()
+
+    y_lo = edges[0][0]
+    y_hi = max(edge[1] for edge in edges)
+    if view is not None:
+        y_lo, y_hi = max(y_lo, view[1]), min(y_hi, view[3])
+
+    # Сколько рёбер кончается на строке: список активных пересобирается только там
+    ends = {}
+    for edge in edges:
+        ends[edge[1]] = ends.get(edge[1], 0) + 1
+
+    spans = []
+    active = []  # [ymax, num, dx, dy, winding]
+    next_edge = 0
+    for y in range(y_lo, y_hi):
+        if y in ends:
+            active = [edge for edge in active if edge[0] > y]
+        # Новые рёбра; для первой видимой строки num считается сразу
+        while next_edge < len(edges) and edges[next_edge][0] <= y:
+            ymin, ymax, x, dx, dy, winding = edges[next_edge]
+            next_edge += 1
+            if ymax > y:
+                active.append([ymax, x * dy + (y - ymin) * dx, dx, dy, winding])
+
+        # Первый закрашиваемый столбец справа от пересечения: ceil(num / dy)
+        crossings = sorted((-(-edge[1] // edge[3]), edge[4]) for edge in active)
+        if rule == "evenodd":
+            for (start, _), (end, _) in zip(crossings[::2], crossings[1::2]):
+                if end > start:
+                    spans.append((start, y, end - start))
+        else:
+            winding = 0
+            for x, direction in crossings:
+                if winding == 0:
+                    start = x
+                winding += direction
+                if winding == 0 and x > start:
+                    spans.append((start, y, x - start))
+
+        for edge in active:
+            edge[1] += edge[2]
+    return _clip_spans(spans, view)
+
+
+def timed(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    t1 = time.perf_counter()
+    return result, (t1 - t0)
+
+
+# Пакетные версии алгоритмов выше: на входе массив (N, 4) концов отрезков
+# x1, y1, x2, y2, на выходе точки всех отрезков подряд (M, 2) и смещения
+# (N + 1,): точки отрезка i — points[offsets[i]:offsets[i + 1]]. Результат
+# совпадает со скалярными функциями точка в точку. numpy импортируется
+# внутри функций, чтобы не утяжелять импорт модуля для GUI.
+
+def _segments_array(segments):
+    import numpy as np
+    seg = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    return seg[:, 0], seg[:, 1], seg[:, 2], seg[:, 3]
+
+
+def _offsets(counts):
+    import numpy as np
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _step_lines(counts, state, step):
+    """Пошаговое продвижение всех отрезков сразу.
+
+    Отрезки упорядочиваются по убыванию длины, поэтому на шаге j активны
+    первые n из них и работа идёт со срезами, а не с масками. state —
+    массивы состояния по отрезкам, они переставляются в этом порядке;
+    step(state, n, j) пишет j-ю точку первых n отрезков и продвигает их.
+    """
+    import numpy as np
+    order = np.argsort(-counts, kind="stable")
+    sorted_counts = counts[order]
+    state = [a[order] for a in state]
+    for j in range(int(sorted_counts[0]) if len(counts) else 0):
+        n = int(np.searchsorted(-sorted_counts, -j, side="left"))
+        step(state, n, j)
+
+
+def step_by_step_line_array(segments):
+    import numpy as np
+    x1, y1, x2, y2 = _segments_array(segments)
+    dx, dy = x2 - x1, y2 - y1
+    counts = np.maximum(np.abs(dx), np.abs(dy)) + 1
+    offsets = _offsets(counts)
+    line = np.repeat(np.arange(len(counts)), counts)
+    j = np.arange(offsets[-1]) - offsets[line]
+
+    # Ведущая ось — x, если |dx| >= |dy| (как в скалярной версии)
+    x_major = (np.abs(dx) >= np.abs(dy))[line]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kx = dy / dx
+        ky = dx / dy
+        bx = y1 - kx * x1
+        by = x1 - ky * y1
+    x = x1[line] + np.where(x2 >= x1, 1, -1)[line] * j
+    y = y1[line] + np.where(y2 >= y1, 1, -1)[line] * j
+    points = np.empty((len(j), 2), dtype=np.int64)
+    with np.errstate(invalid="ignore"):
+        points[:, 0] = np.where(x_major, x, np.rint(ky[line] * y + by[line]))
+        points[:, 1] = np.where(x_major, np.rint(kx[line] * x + bx[line]), y)
+    # Вырожденный отрезок — одна точка (x1, y1)
+    single = (counts == 1)
+    points[offsets[:-1][single]] = np.stack([x1[single], y1[single]], axis=1)
+    return points, offsets
+
+
+def dda_line_array(segments):
+    import numpy as np
+    x1, y1, x2, y2 = _segments_array(segments)
+    dx, dy = x2 - x1, y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    counts = steps + 1
+    offsets = _offsets(counts)
+    points = np.empty((offsets[-1], 2), dtype=np.int64)
+    safe = np.maximum(steps, 1)
+
+    # Координаты накапливаются прибавлением приращения, как в скалярном
+    # цикле, поэтому и ошибки округления float совпадают
+    def step(state, n, j):
+        x, y, x_inc, y_inc, start = state
+        idx = start[:n] + j
+        points[idx, 0] = np.rint(x[:n])
+        points[idx, 1] = np.rint(y[:n])
+        x[:n] += x_inc[:n]
+        y[:n] += y_inc[:n]
+
+    _step_lines(counts, [x1.astype(np.float64), y1.astype(np.float64),
+                         dx / safe, dy / safe, offsets[:-1]], step)
+    return points, offsets
+
+
+def bresenham_line_array(segments):
+    import numpy as np
+    x1, y1, x2, y2 = _segments_array(segments)
+    dx, dy = np.abs(x2 - x1), np.abs(y2 - y1)
+    counts = np.maximum(dx, dy) + 1
+    offsets = _offsets(counts)
+    points = np.empty((offsets[-1], 2), dtype=np.int64)
+
+    def step(state, n, j):
+        x, y, err, dx, dy, sx, sy, start = state
+        idx = start[:n] + j
+        points[idx, 0] = x[:n]
+        points[idx, 1] = y[:n]
+        e2 = 2 * err[:n]
+        move_x = e2 > -dy[:n]
+        move_y = e2 < dx[:n]
+        err[:n] -= dy[:n] * move_x
+        x[:n] += sx[:n] * move_x
+        err[:n] += dx[:n] * move_y
+        y[:n] += sy[:n] * move_y
+
+    _step_lines(counts, [x1, y1, dx - dy, dx, dy,
+                         np.where(x1 < x2, 1, -1), np.where(y1 < y2, 1, -1), offsets[:-1]], step)
+    return points, offsets
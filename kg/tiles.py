@@ -0,0 +1,172 @@
+"""Полосовая обработка больших изображений: конвертация в HSV/CMYK и резкость.
+
+Исходник читается полосами строк (raw и .npy — через memmap), каждая
+полоса обрабатывается функциями kg.color / kg.image, результат пишется
+по каналам в отдельные .npy (h.npy, s.npy, ..., sharpen.npy) через memmap.
+
+    python -m kg.tiles photo.raw --width 20000 --height 20000 --to cmyk -o out/
+    python -m kg.tiles scan.raw --width 40000 --height 30000 --channels 1 --to sharpen --workers 4 -o out/
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from kg.color import ColorLUT, rgb_to_hsv_array, rgb_to_cmyk_array
+from kg.image import apply_sharpen
+
+# Каналы результата и их типы
+PLANES = {
+    "hsv": (("h", np.uint16), ("s", np.uint8), ("v", np.uint8)),
+    "cmyk": (("c", np.uint8), ("m", np.uint8), ("y", np.uint8), ("k", np.uint8)),
+    "sharpen": (("sharpen", np.uint8),),
+}
+# Оценка рабочей памяти конвертации на пиксель (временные массивы float64)
+WORK_BYTES_PER_PIXEL = 128
+
+
+def open_source(path, width=None, height=None, channels=3):
+    """Массив RGB (H, W, 3) или серый (H, W) uint8; raw и .npy не читаются в память целиком."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        return np.load(path, mmap_mode="r")
+    if ext in (".raw", ".rgb"):
+        if not width or not height:
+            raise ValueError("Для raw-файла нужны ширина и высота")
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        return np.memmap(path, dtype=np.uint8, mode="r", shape=shape)
+    # Остальные форматы OpenCV умеет только целиком
+    import cv2
+    img = cv2.imread(path, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Не удалось прочитать {path}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def strip_rows_for(width, memory_mb):
+    return max(1, memory_mb * (1 << 20) // (width * WORK_BYTES_PER_PIXEL))
+
+
+def open_planes(out_dir, space, height, width):
+    os.makedirs(out_dir, exist_ok=True)
+    return [np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+",
+                                      dtype=dtype, shape=(height, width))
+            for name, dtype in PLANES[space]]
+
+
+def make_report(width, height, strip_rows, seconds, peak):
+    return {
+        "width": width,
+        "height": height,
+        "strip_rows": strip_rows,
+        "seconds": seconds,
+        "mpix_per_s": width * height / 1e6 / seconds if seconds else 0.0,
+        "peak_mb": peak / (1 << 20),
+    }
+
+
+def convert_image(src, out_dir, space, strip_rows=None, memory_mb=256, lut=None):
+    """Конвертирует src полосами и возвращает отчёт о времени и пиковой памяти."""
+    if space not in ("hsv", "cmyk"):
+        raise ValueError(f"Неизвестное пространство: {space}")
+    height, width = src.shape[:2]
+    if strip_rows is None:
+        strip_rows = strip_rows_for(width, memory_mb)
+    planes = open_planes(out_dir, space, height, width)
+
+    t0 = time.perf_counter()
+    tracemalloc.start()
+    try:
+        for top in range(0, height, strip_rows):
+            strip = np.asarray(src[top:top + strip_rows])
+            if space == "hsv":
+                out = lut.rgb_to_hsv(strip) if lut is not None else rgb_to_hsv_array(strip)
+            else:
+                out = lut.rgb_to_cmyk(strip) if lut is not None else rgb_to_cmyk_array(strip)
+            for i, plane in enumerate(planes):
+                plane[top:top + len(strip)] = out[..., i]
+                # Сбрасываем грязные страницы, чтобы они не копились в памяти процесса
+                plane.flush()
+            del strip, out
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return make_report(width, height, strip_rows, time.perf_counter() - t0, peak)
+
+
+def to_gray_strip(strip):
+    import cv2
+    if strip.ndim == 2:
+        return strip
+    return cv2.cvtColor(strip, cv2.COLOR_RGB2GRAY)
+
+
+def sharpen_image(src, out_dir, strip_rows=None, memory_mb=256, workers=1, amount=9.0, radius=1):
+    """Повышение резкости полосами с перекрытием в radius строк.
+
+    Соседние строки берутся из исходника и отбрасываются после свёртки,
+    поэтому швы совпадают с обработкой целого изображения бит в бит.
+    OpenCV отпускает GIL, так что полосы можно считать в нескольких потоках.
+    """
+    height, width = src.shape[:2]
+    if strip_rows is None:
+        strip_rows = strip_rows_for(width, memory_mb // max(1, workers))
+    out, = open_planes(out_dir, "sharpen", height, width)
+
+    def run_strip(top):
+        bottom = min(top + strip_rows, height)
+        lo, hi = max(top - radius, 0), min(bottom + radius, height)
+        block = apply_sharpen(to_gray_strip(np.asarray(src[lo:hi])), amount, radius)
+        out[top:bottom] = block[top - lo:bottom - lo]
+
+    t0 = time.perf_counter()
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run_strip, range(0, height, strip_rows)))
+        out.flush()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return make_report(width, height, strip_rows, time.perf_counter() - t0, peak)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Полосовая обработка изображения: HSV/CMYK или резкость")
+    parser.add_argument("input", help="raw (.raw/.rgb), .npy (H, W[, 3]) или обычное изображение")
+    parser.add_argument("--to", dest="space", choices=sorted(PLANES), required=True)
+    parser.add_argument("-o", "--out-dir", required=True, help="каталог для каналов результата")
+    parser.add_argument("--width", type=int, help="ширина raw-файла")
+    parser.add_argument("--height", type=int, help="высота raw-файла")
+    parser.add_argument("--channels", type=int, choices=(1, 3), default=3, help="каналов в raw-файле")
+    parser.add_argument("--strip-rows", type=int, help="строк в полосе (по умолчанию из --memory-mb)")
+    parser.add_argument("--memory-mb", type=int, default=256, help="бюджет рабочей памяти на полосу")
+    parser.add_argument("--lut", metavar="DIR", help="использовать таблицы подстановки из каталога")
+    parser.add_argument("--workers", type=int, default=1, help="потоков для --to sharpen")
+    parser.add_argument("--amount", type=float, default=9.0, help="сила резкости для --to sharpen")
+    parser.add_argument("--radius", type=int, default=1, help="радиус окна для --to sharpen")
+    args = parser.parse_args(argv)
+
+    try:
+        src = open_source(args.input, args.width, args.height, args.channels)
+        if args.space == "sharpen":
+            report = sharpen_image(src, args.out_dir, args.strip_rows, args.memory_mb, args.workers,
+                                   args.amount, args.radius)
+        else:
+            report = convert_image(src, args.out_dir, args.space, args.strip_rows, args.memory_mb,
+                                   ColorLUT(args.lut) if args.lut else None)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    print(f"{report['width']}x{report['height']}, полоса {report['strip_rows']} строк: "
+          f"{report['seconds']:.2f} с, {report['mpix_per_s']:.1f} Мп/с, "
+          f"пик памяти {report['peak_mb']:.1f} МБ")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
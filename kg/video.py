@@ -0,0 +1,207 @@
+"""Покадровая обработка видеофайлов методами kg.image.
+
+Чтение (cv2.VideoCapture), обработка и запись (cv2.VideoWriter) идут в трёх
+потоках, связанных очередями ограниченной длины; OpenCV отпускает GIL, так
+что стадии работают параллельно.
+
+    python -m kg.video in.mp4 out.avi --method threshold_otsu
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+from kg.image import METHODS, apply_method, to_gray
+
+FOURCC_BY_EXT = {".avi": "MJPG", ".mp4": "mp4v", ".mkv": "XVID"}
+STAGE_NAMES = {"decode": "чтение", "process": "обработка", "encode": "запись"}
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy = 0.0
+        self.max_queue = 0
+
+    @property
+    def fps(self):
+        # Пропускная способность стадии без учёта ожидания в очередях
+        return self.frames / self.busy if self.busy else 0.0
+
+
+class VideoPipeline:
+    def __init__(self, src_path, dst_path, method="sharpen", thresh=127, window=15,
+                 queue_size=8, fourcc=None, preview_every=0, on_preview=None):
+        if method not in METHODS:
+            raise ValueError(f"Неизвестный метод: {method}")
+        self.src_path = src_path
+        self.dst_path = dst_path
+        self.method = method
+        self.thresh = thresh
+        self.window = window
+        self.fourcc = fourcc or FOURCC_BY_EXT.get(os.path.splitext(dst_path)[1].lower(), "MJPG")
+        self.preview_every = preview_every
+        self.on_preview = on_preview
+        self.decoded = queue.Queue(maxsize=queue_size)
+        self.processed = queue.Queue(maxsize=queue_size)
+        self.stats = {key: StageStats(name) for key, name in STAGE_NAMES.items()}
+        self.stop_event = threading.Event()
+        self.error = None
+        self.t0 = None
+        self._threads = []
+
+    def _put(self, q, item, stats):
+        # put с периодической проверкой остановки, чтобы стадии не зависли навсегда
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                stats.max_queue = max(stats.max_queue, q.qsize())
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, q):
+        while not self.stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def _guard(self, func):
+        def run():
+            try:
+                func()
+            except Exception as e:
+                self.error = e
+                self.stop_event.set()
+        return run
+
+    def _decode(self):
+        import cv2
+        stats = self.stats["decode"]
+        cap = cv2.VideoCapture(self.src_path)
+        if not cap.isOpened():
+            raise ValueError(f"Не удалось открыть {self.src_path}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        try:
+            while not self.stop_event.is_set():
+                t = time.perf_counter()
+                ok, frame = cap.read()
+                stats.busy += time.perf_counter() - t
+                if not ok:
+                    break
+                stats.frames += 1
+                if not self._put(self.decoded, frame, stats):
+                    break
+        finally:
+            cap.release()
+            self._put(self.decoded, _DONE, stats)
+
+    def _process(self):
+        stats = self.stats["process"]
+        while True:
+            frame = self._get(self.decoded)
+            if frame is _DONE:
+                break
+            t = time.perf_counter()
+            result = apply_method(to_gray(frame), self.method, self.thresh, self.window)
+            stats.busy += time.perf_counter() - t
+            stats.frames += 1
+            if self.on_preview and self.preview_every and stats.frames % self.preview_every == 0:
+                # Колбэк только сохраняет ссылку на кадр — показ идёт в своём потоке
+                self.on_preview(stats.frames, result)
+            if not self._put(self.processed, result, stats):
+                break
+        self._put(self.processed, _DONE, stats)
+
+    def _encode(self):
+        import cv2
+        stats = self.stats["encode"]
+        writer = None
+        try:
+            while True:
+                frame = self._get(self.processed)
+                if frame is _DONE:
+                    break
+                t = time.perf_counter()
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.dst_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                             self.fps, (w, h))
+                    if not writer.isOpened():
+                        raise ValueError(f"Не удалось открыть {self.dst_path} для записи")
+                writer.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+                stats.busy += time.perf_counter() - t
+                stats.frames += 1
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def start(self):
+        self.fps = 25.0
+        self.t0 = time.perf_counter()
+        for target in (self._decode, self._process, self._encode):
+            thread = threading.Thread(target=self._guard(target), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+
+    def report(self):
+        elapsed = time.perf_counter() - self.t0 if self.t0 else 0.0
+        parts = [f"{s.name} {s.fps:.1f} к/с" for s in self.stats.values()]
+        frames = self.stats["encode"].frames
+        total_fps = frames / elapsed if elapsed else 0.0
+        return (f"кадров {frames}, {total_fps:.1f} к/с; " + ", ".join(parts) +
+                f"; очереди {self.decoded.qsize()}/{self.processed.qsize()} "
+                f"(макс. {self.stats['decode'].max_queue}/{self.stats['process'].max_queue})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Покадровая обработка видео (резкость, пороги)")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--method", choices=METHODS, default="sharpen")
+    parser.add_argument("--threshold", type=int, default=127, help="порог для threshold_manual")
+    parser.add_argument("--window", type=int, default=15, help="окно для threshold_mean/threshold_sauvola")
+    parser.add_argument("--queue", type=int, default=8, help="длина очередей между стадиями")
+    parser.add_argument("--fourcc", help="кодек записи, например MJPG (по умолчанию по расширению)")
+    args = parser.parse_args(argv)
+
+    pipeline = VideoPipeline(args.input, args.output, args.method, args.threshold, args.window,
+                             args.queue, args.fourcc).start()
+    try:
+        while pipeline.running:
+            pipeline.join(timeout=1.0)
+            print(pipeline.report(), file=sys.stderr)
+        pipeline.join()
+    except KeyboardInterrupt:
+        pipeline.stop()
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    print(pipeline.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
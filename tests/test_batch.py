@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from kg.batch import process_file, run
+
+
+def test_unreadable_file_names_the_path(tmp_path):
+    src = tmp_path / "bad.jpg"
+    src.write_bytes(b"not an image")
+    with pytest.raises(ValueError, match="bad.jpg"):
+        process_file(str(src), str(tmp_path / "out" / "bad.jpg"), "sharpen", 127)
+
+
+def test_run_logs_failed_files(tmp_path):
+    import cv2
+    in_dir, out_dir = tmp_path / "in", tmp_path / "out"
+    in_dir.mkdir()
+    cv2.imwrite(str(in_dir / "good.png"), np.full((8, 8, 3), 100, dtype=np.uint8))
+    (in_dir / "bad.jpg").write_bytes(b"not an image")
+    messages = []
+    report = run(str(in_dir), str(out_dir), "threshold_otsu", workers=2, log=messages.append)
+    assert report["done"] == 1 and report["failed"] == 1
+    assert any("bad.jpg" in message for message in messages)
+    assert (out_dir / "good.png").exists()
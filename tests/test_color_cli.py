@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+from kg.color_cli import main, parse_chunk, run
+
+
+def convert_text(text, src, dst, fmt="csv", **kwargs):
+    out = io.StringIO()
+    run(io.StringIO(text), out, src, dst, fmt, **kwargs)
+    return out.getvalue()
+
+
+def test_parse_hex():
+    arr = parse_chunk(["#FF8000\n", "\n", "00ff7f\n"], "hex", "csv")
+    assert arr.tolist() == [[255, 128, 0], [0, 255, 127]]
+
+
+def test_parse_csv_and_jsonl():
+    assert parse_chunk(["1,2,3\n", "4,5,6\n"], "rgb", "csv").tolist() == [[1, 2, 3], [4, 5, 6]]
+    lines = ['[0, 0, 0, 100]\n', '{"c": 0, "m": 100, "y": 100, "k": 0}\n']
+    assert parse_chunk(lines, "cmyk", "jsonl").tolist() == [[0, 0, 0, 100], [0, 100, 100, 0]]
+
+
+def test_round_trip():
+    assert convert_text("#FF0000\n#00FF00\n", "hex", "rgb") == "255,0,0\n0,255,0\n"
+    assert convert_text("[255, 0, 0]\n", "rgb", "hex", "jsonl") == "#FF0000\n"
+
+
+@pytest.mark.parametrize("lines, space, fmt", [
+    (["#FFF\n"], "hex", "csv"),
+    (["#GG0000\n"], "hex", "csv"),
+    (["1,2,3,4,5,6\n"], "rgb", "csv"),
+    (["0,0,0\n"], "cmyk", "csv"),
+    (["[1, 2]\n"], "rgb", "jsonl"),
+    (['{"c": 0, "m": 0, "y": 0}\n'], "cmyk", "jsonl"),
+    (["[1, 2, 3\n"], "rgb", "jsonl"),
+    (["300,0,0\n"], "rgb", "csv"),
+    (["0,120,50\n"], "hsv", "csv"),
+])
+def test_errors_name_the_line(lines, space, fmt):
+    with pytest.raises(ValueError, match="строка 4"):
+        parse_chunk(["\n"] + lines, space, fmt, start=3)
+
+
+def test_mixed_lengths_name_the_line():
+    # Номер строки — во всём входе, а не в чанке
+    text = "[1, 2, 3]\n[4, 5, 6]\n[7, 8, 9, 10]\n"
+    with pytest.raises(ValueError, match="строка 3"):
+        convert_text(text, "rgb", "hsv", "jsonl", chunk_size=2)
+
+
+def test_main_exit_code(tmp_path, capsys):
+    src = tmp_path / "in.csv"
+    src.write_text("0,0,0\n1,2,3,4,5,6\n")
+    assert main(["--from", "rgb", "--to", "hex", "-i", str(src), "-o", str(tmp_path / "out")]) == 1
+    assert "строка 2" in capsys.readouterr().err
+    src.write_text("0,0,0\n")
+    assert main(["--from", "rgb", "--to", "hex", "-i", str(src), "-o", str(tmp_path / "out")]) == 0
+    assert (tmp_path / "out").read_text() == "#000000\n"
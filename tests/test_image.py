@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from kg.image import SharpenEngine
+
+
+def reference_unsharp(img, amount, radius, top=255):
+    # Точная формула в float64 с тем же отражением краёв, что у OpenCV по умолчанию
+    d = 2 * radius + 1
+    p = np.pad(img.astype(np.float64), radius, mode="reflect")
+    h, w = img.shape
+    mean = sum(p[i:i + h, j:j + w] for i in range(d) for j in range(d)) / (d * d)
+    return np.clip(np.floor(img + amount * (img - mean) + 0.5), 0, top)
+
+
+def test_sharpen_matches_float_reference():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(60, 70), dtype=np.uint8)
+    for amount in (1.5, 3.0, 9.0, 0.7):
+        for radius in (2, 4):
+            result = SharpenEngine(amount, radius).apply(img)
+            diff = np.abs(result.astype(np.int64) - reference_unsharp(img, amount, radius))
+            assert result.dtype == np.uint8
+            assert diff.max() <= 1
+            assert (diff == 0).mean() > 0.99
+
+
+def test_sharpen_out_buffer():
+    img = np.full((10, 12), 100, dtype=np.uint8)
+    out = np.empty_like(img)
+    assert SharpenEngine(2.0, 3).apply(img, out) is out
+    np.testing.assert_array_equal(out, img)
+
+
+def test_sharpen_uint16():
+    # Насыщение — по максимуму uint16, а не 255; radius 100 — сумма окна шире int32
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 65536, size=(40, 50), dtype=np.uint16)
+    for amount, radius in ((1.5, 2), (9.0, 4), (0.7, 100)):
+        result = SharpenEngine(amount, radius).apply(img)
+        diff = np.abs(result.astype(np.int64) - reference_unsharp(img, amount, radius, 65535))
+        assert result.dtype == np.uint16
+        assert result.max() > 255
+        assert diff.max() <= 1
+
+
+def test_sharpen_rejects_float():
+    with pytest.raises(ValueError):
+        SharpenEngine(2.0, 3).apply(np.zeros((4, 4), dtype=np.float32))
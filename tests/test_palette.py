@@ -0,0 +1,21 @@
+import numpy as np
+
+from kg.palette import PaletteIndex
+
+PALETTE = np.array([[0, 0, 0], [255, 255, 255], [255, 0, 0], [0, 128, 255]], dtype=np.uint8)
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(500, 3), dtype=np.uint8)
+    idx, dist = PaletteIndex(PALETTE).query(rgb)
+    d = np.sqrt(((rgb[:, None, :].astype(float) - PALETTE[None].astype(float)) ** 2).sum(axis=-1))
+    np.testing.assert_allclose(dist, d.min(axis=1))
+    np.testing.assert_allclose(d[np.arange(len(rgb)), idx], d.min(axis=1))
+
+
+def test_query_empty():
+    for exact in (True, False):
+        idx, dist = PaletteIndex(PALETTE).query(np.empty((0, 3)), exact=exact)
+        assert idx.shape == (0,) and idx.dtype == np.int64
+        assert dist.shape == (0,)
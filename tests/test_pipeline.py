@@ -0,0 +1,33 @@
+import numpy as np
+
+from kg.image import threshold_otsu, to_gray
+from kg.pipeline import Pipeline
+
+
+def color_image():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(64, 80, 3), dtype=np.uint8)
+    img[:, :40] //= 4
+    return img
+
+
+def test_gray_inserted_before_threshold():
+    assert str(Pipeline.parse("otsu")) == "gray > otsu"
+    assert str(Pipeline.parse("invert > sauvola")).startswith("invert > gray > sauvola")
+    assert str(Pipeline.parse("gray > mean")).count("gray") == 1
+
+
+def test_color_input():
+    img = color_image()
+    result = Pipeline.parse("otsu").run(img)
+    assert result.shape == img.shape[:2]
+    np.testing.assert_array_equal(result, threshold_otsu(to_gray(img)))
+    # Поточечные этапы на цветном входе сохраняют каналы
+    assert Pipeline.parse("invert").run(img).shape == img.shape
+
+
+def test_lut_fusion_matches_sequential():
+    img = color_image()
+    fused = Pipeline.parse("gray > invert > threshold(thresh=100)").run(img)
+    expected = np.where(255 - to_gray(img) > 100, 255, 0)
+    np.testing.assert_array_equal(fused, expected)
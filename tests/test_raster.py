@@ -0,0 +1,171 @@
+import random
+
+import numpy as np
+
+from kg.raster import (bresenham_line, bresenham_line_array, castle_pitway_line, dda_line, dda_line_array,
+                       filled_ellipse_spans, in_view, midpoint_ellipse, polygon_spans, polyline,
+                       step_by_step_line, step_by_step_line_array)
+
+BATCH = ((step_by_step_line, step_by_step_line_array), (dda_line, dda_line_array),
+         (bresenham_line, bresenham_line_array))
+
+
+def test_castle_pitway_order_matches_bresenham():
+    # Во всех направлениях, в том числе справа налево и сверху вниз
+    rng = random.Random(0)
+    for _ in range(300):
+        x1, y1, x2, y2 = (rng.randint(-30, 30) for _ in range(4))
+        assert castle_pitway_line(x1, y1, x2, y2) == bresenham_line(x1, y1, x2, y2)
+
+
+def test_castle_pitway_right_to_left():
+    points = castle_pitway_line(10, 3, -7, -1)
+    assert points[0] == (10, 3) and points[-1] == (-7, -1)
+    assert all(b[0] == a[0] - 1 for a, b in zip(points, points[1:]))
+
+
+def random_view(rng):
+    xmin, ymin = rng.randint(-40, 10), rng.randint(-40, 10)
+    return xmin, ymin, xmin + rng.randint(1, 50), ymin + rng.randint(1, 50)
+
+
+def test_clipped_lines_match_unclipped():
+    # Отсечение не меняет пикселей: при сдвиге вида отрезок не «дрожит»
+    rng = random.Random(1)
+    for _ in range(500):
+        x1, y1, x2, y2 = (rng.randint(-60, 60) for _ in range(4))
+        view = random_view(rng)
+        for line in (bresenham_line, castle_pitway_line):
+            assert line(x1, y1, x2, y2, view=view) == in_view(line(x1, y1, x2, y2), view)
+
+
+def test_clipped_dda_uses_direct_formula():
+    # С view точка шага i — x1 + i * x_inc, без накопления суммы
+    rng = random.Random(3)
+    for _ in range(500):
+        x1, y1, x2, y2 = (rng.randint(-60, 60) for _ in range(4))
+        view = random_view(rng)
+        steps = max(abs(x2 - x1), abs(y2 - y1), 1)
+        direct = [(round(x1 + i * (x2 - x1) / steps), round(y1 + i * (y2 - y1) / steps))
+                  for i in range(steps + 1)]
+        assert dda_line(x1, y1, x2, y2, view=view) == in_view(direct, view)
+
+
+def test_dda_accumulates():
+    # Без view — исходный DDA с накоплением: (-153, -59) -> (-180, -3)
+    # расходится с прямой формулой
+    x, y, points = -153, -59, []
+    for _ in range(57):
+        points.append((round(x), round(y)))
+        x += -27 / 56
+        y += 56 / 56
+    assert dda_line(-153, -59, -180, -3) == points
+
+
+def test_batch_lines_match_scalar():
+    # Скалярные функции — эталон; нулевые отрезки вперемешку с обычными
+    rng = random.Random(4)
+    segments = [tuple(rng.randint(-200, 200) for _ in range(4)) for _ in range(2000)]
+    segments += [(5, -7, 5, -7), (-153, -59, -180, -3), (0, 0, 0, 0)]
+    rng.shuffle(segments)
+    for scalar, batch in BATCH:
+        points, offsets = batch(segments)
+        assert offsets[0] == 0 and offsets[-1] == len(points)
+        for i, segment in enumerate(segments):
+            assert points[offsets[i]:offsets[i + 1]].tolist() == [list(p) for p in scalar(*segment)]
+
+
+def test_batch_lines_empty_and_single():
+    for _, batch in BATCH:
+        points, offsets = batch(np.empty((0, 4), dtype=np.int64))
+        assert points.shape == (0, 2) and offsets.tolist() == [0]
+        points, offsets = batch([(3, 4, 3, 4)])
+        assert points.tolist() == [[3, 4]] and offsets.tolist() == [0, 1]
+
+
+def test_castle_pitway_long_segment_small_view():
+    # 10^9 шагов: строка ходов не строится, берутся только видимые ходы
+    n = 10 ** 9
+    for x2, y2 in ((n, 2 * n // 3 + 7), (-n, n - 1), (n // 3 + 1, -n), (1414213562, 1060660172)):
+        cx, cy = x2 // 2, y2 // 2
+        view = (cx - 10, cy - 10, cx + 10, cy + 10)
+        points = castle_pitway_line(0, 0, x2, y2, view=view)
+        assert points and points == bresenham_line(0, 0, x2, y2, view=view)
+
+
+def cells(spans):
+    return sorted((x + i, y) for x, y, length in spans for i in range(length))
+
+
+def test_clipped_ellipse_matches_unclipped():
+    rng = random.Random(2)
+    for _ in range(300):
+        a, b = rng.randint(0, 40), rng.randint(0, 40)
+        xc, yc = rng.randint(-20, 20), rng.randint(-20, 20)
+        xmin, ymin = rng.randint(-60, 40), rng.randint(-60, 40)
+        view = (xmin, ymin, xmin + rng.randint(1, 60), ymin + rng.randint(1, 60))
+        outline = midpoint_ellipse(xc, yc, a, b, view=view)
+        assert sorted(outline) == sorted(in_view(midpoint_ellipse(xc, yc, a, b), view))
+        assert len(set(outline)) == len(outline)
+        filled = cells(filled_ellipse_spans(xc, yc, a, b, view=view))
+        assert filled == sorted(in_view(cells(filled_ellipse_spans(xc, yc, a, b)), view))
+
+
+def test_large_ellipse_small_view():
+    # Работа — по видимым пикселям: у вершины, на верхней оси и на склоне
+    a, b = 30000, 20000
+    full = midpoint_ellipse(0, 0, a, b)
+    view = (-40, 19990, 40, 20010)
+    # Серии неотсечённой заливки обрезаются по виду, не разворачиваясь в пиксели
+    clipped = [(max(x, view[0]), y, min(x + length, view[2]) - max(x, view[0]))
+               for x, y, length in filled_ellipse_spans(0, 0, a, b) if view[1] <= y < view[3]]
+    assert cells(filled_ellipse_spans(0, 0, a, b, view=view)) == cells(clipped)
+    for view in ((a - 50, -20, a + 10, 20), (-30, b - 40, 30, b + 5), (21000, 14000, 21400, 14400)):
+        assert sorted(midpoint_ellipse(0, 0, a, b, view=view)) == sorted(in_view(full, view))
+
+    # Радиус 10^9: у вершин результат считается по формуле окружности;
+    # время — в benchmarks/clipped_view.py
+    r = 10 ** 9
+    outline = midpoint_ellipse(0, 0, r, r, view=(r - 50, -20, r + 10, 20))
+    assert sorted(outline) == [(r, y) for y in range(-20, 20)]
+    outline = midpoint_ellipse(0, 0, r, r, view=(-30, r - 40, 30, r + 5))
+    assert sorted(outline) == sorted((x, r) for x in range(-30, 30))
+    spans = filled_ellipse_spans(0, 0, r, r, view=(r - 50, -20, r + 10, 20))
+    assert sorted(spans) == [(r - 50, y, 51) for y in range(-20, 20)]
+
+
+def inside(vertices, px, py, rule):
+    # Грубая проверка центра пикселя: пересечения строки py с рёбрами
+    # (ymin <= py < ymax) левее px или в нём, в целых без округления
+    winding = 0
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]):
+        direction = 1 if y2 > y1 else -1
+        if y1 > y2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        if y1 <= py < y2 and x1 * (y2 - y1) + (py - y1) * (x2 - x1) <= px * (y2 - y1):
+            winding += direction if rule == "nonzero" else 1
+    return winding % 2 == 1 if rule == "evenodd" else winding != 0
+
+
+def test_polygon_spans_brute_force():
+    rng = random.Random(5)
+    for _ in range(150):
+        vertices = [(rng.randint(-15, 15), rng.randint(-15, 15)) for _ in range(rng.randint(3, 9))]
+        view = random_view(rng)
+        for rule in ("evenodd", "nonzero"):
+            expected = sorted((x, y) for y in range(-16, 16) for x in range(-16, 16)
+                              if inside(vertices, x, y, rule))
+            assert cells(polygon_spans(vertices, rule)) == expected
+            assert cells(polygon_spans(vertices, rule, view=view)) == sorted(in_view(expected, view))
+
+
+def test_closed_polyline_without_repeated_vertex():
+    square = [(0, 0), (4, 0), (4, 3), (0, 3)]
+    points = polyline(square, closed=True)
+    border = {(x, y) for x in range(5) for y in range(4) if x in (0, 4) or y in (0, 3)}
+    assert points[0] == (0, 0) and len(points) == len(border) == len(set(points))
+    assert set(points) == border
+    view = (2, -1, 10, 2)
+    assert polyline(square, closed=True, view=view) == in_view(points, view)
+    # Незамкнутая ломаная не содержит замыкающего ребра
+    assert (0, 1) not in polyline(square)